@@ -0,0 +1,77 @@
+### File: adjudicate.py
+### Classes defined: HareAdjudicator, KonaneAdjudicator
+###
+### Early adjudication for playOneGame and playNGames.  An adjudicator
+### is asked before every move whether the game is already decided with
+### best play; if it is, the game is scored without playing the moves
+### that are left.  Each adjudicator runs a fast check first and only
+### then a bounded exact solve, and it answers None whenever it cannot
+### prove the result, so an adjudicated game always has the result that
+### perfect play would give it.
+
+from endgame import EndgameSolver
+from pnsearch import ProofNumberSearch
+from search import WIN, HareRules, SearchEngine
+
+
+class HareAdjudicator:
+    """
+    Adjudicates Hounds and Hare.  The fast check is the hare having got
+    left of every hound, which the hounds can never undo; after that a
+    search of depth plies looks for a forced trap or escape.  rules
+    defaults to the standard board; pass a VariantRules for a
+    VariantHoundsAndHare.
+    """
+    def __init__(self, depth=6, rules=None):
+        self.depth = depth
+        self.rules = rules if rules is not None else HareRules()
+        self.engine = SearchEngine(self.rules)
+
+    def winner(self, game, player):
+        """
+        Returns the side that wins game's position with player to move,
+        or None if it is not yet decided.
+        """
+        state = self.rules.state(game.board, player, game.stall)
+        result = self.rules.result(state)
+        if result is not None or self.depth == 0:
+            return result
+        if not self.rules.moves(state):
+            return self.rules.game.opponent(player)
+        value, move = self.engine.search(state, self.depth)
+        if value >= WIN - self.depth:
+            return player
+        if value <= self.depth - WIN:
+            return self.rules.game.opponent(player)
+        return None
+
+
+class KonaneAdjudicator:
+    """
+    Adjudicates Konane.  Positions with at most threshold pieces are
+    solved exactly by EndgameSolver; when nodeLimit is given, larger
+    positions are tried with proof-number search, giving up after
+    nodeLimit nodes.
+    """
+    def __init__(self, size, threshold=12, nodeLimit=None):
+        self.endgame = EndgameSolver(size, threshold)
+        self.prover = None
+        if nodeLimit is not None:
+            self.prover = ProofNumberSearch(size, nodeLimit=nodeLimit)
+
+    def winner(self, game, player):
+        """
+        Returns the side that wins game's position with player to move,
+        or None if it is not yet decided.
+        """
+        board = game.board
+        if game.openingMove(board):
+            return None
+        if not game.generateMoves(board, player):
+            return game.opponent(player)
+        won = self.endgame.probe(board, player)
+        if won is None and self.prover is not None:
+            won = self.prover.solve(board, player)
+        if won is None:
+            return None
+        return player if won else game.opponent(player)
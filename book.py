@@ -0,0 +1,134 @@
+### File: book.py
+### Classes defined: OpeningBook, BookPlayer
+###
+### Opening books for both games.  Every game starts from the same
+### reset() position and the first few plies come from a small set of
+### moves, so the same early positions are searched over and over.  The
+### book builder searches every position of the first N plies once,
+### offline and deeply, and BookPlayer answers from the book for as
+### long as the game stays in it.
+###
+### A book file is the header BOOK_HEADER (magic and entry count)
+### followed by one BOOK_ENTRY per position: the 64-bit stable hash of
+### the position key, the packed best move and the score.
+
+import struct
+
+from search import makeEngine, stableHash
+
+BOOK_MAGIC = b'HHBK'
+BOOK_HEADER = struct.Struct('<4sI')
+BOOK_ENTRY = struct.Struct('<QHi')
+
+
+class OpeningBook:
+    """
+    Maps positions to (best move, score) for one game's Rules.
+    """
+    def __init__(self, rules):
+        self.rules = rules
+        self.entries = {}
+
+    def build(self, plies, depth, evaluate=None, workers=1):
+        """
+        Searches every position reachable in fewer than plies moves from
+        the start of the game to the given depth and records the best move
+        and score of each.  Positions are rebuilt from their board and
+        side to move with rules.state, as BookPlayer looks them up, so
+        anything else a state carries (the Hounds and Hare stall count)
+        starts from its default.
+        """
+        engine = makeEngine(self.rules, evaluate, workers)
+        frontier = [self.rules.start()]
+        seen = set()
+        for ply in range(plies):
+            following = []
+            for state in frontier:
+                state = self.rules.state(state[0], state[1])
+                key = self.rules.key(state)
+                if key in seen:
+                    continue
+                seen.add(key)
+                moves = self.rules.moves(state)
+                if not moves or self.rules.result(state) is not None:
+                    continue
+                value, move = engine.search(state, depth)
+                if move is None:
+                    move = moves[0]
+                self.entries[stableHash(key)] = \
+                    (self.rules.packMove(move), value)
+                following.extend(self.rules.play(state, m) for m in moves)
+            frontier = following
+        return self
+
+    def lookup(self, state):
+        """
+        Returns (move, score) for state, or None if it is not in the book.
+        """
+        state = self.rules.state(state[0], state[1])
+        entry = self.entries.get(stableHash(self.rules.key(state)))
+        if entry is None:
+            return None
+        return self.rules.unpackMove(entry[0]), entry[1]
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(BOOK_HEADER.pack(BOOK_MAGIC, len(self.entries)))
+            for h, (code, score) in self.entries.items():
+                f.write(BOOK_ENTRY.pack(h, code, score))
+
+    def load(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, count = BOOK_HEADER.unpack_from(data, 0)
+        if magic != BOOK_MAGIC:
+            raise ValueError(path + " is not an opening book")
+        self.entries = {}
+        for h, code, score in BOOK_ENTRY.iter_unpack(
+                data[BOOK_HEADER.size:BOOK_HEADER.size +
+                     count * BOOK_ENTRY.size]):
+            self.entries[h] = (code, score)
+        return self
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class BookPlayer:
+    """
+    Wraps any player of the book's game.  While the position is in the
+    book the book's move is played at once; after that every move comes
+    from the wrapped player.  Wins and losses are recorded on the wrapped
+    player.
+    """
+    def __init__(self, player, book):
+        self.player = player
+        self.book = book
+        self.name = player.name
+
+    def initialize(self, side):
+        self.player.initialize(side)
+        self.side = side
+        self.name = self.player.name
+
+    def getMove(self, board):
+        state = self.book.rules.state(board, self.side)
+        entry = self.book.lookup(state)
+        if entry is not None and entry[0] in self.book.rules.moves(state):
+            return entry[0]
+        return self.player.getMove(board)
+
+    def results(self):
+        return self.player.results()
+
+    def score(self):
+        return self.player.score()
+
+    def won(self):
+        self.player.won()
+
+    def lost(self):
+        self.player.lost()
+
+    def reset(self):
+        self.player.reset()
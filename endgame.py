@@ -0,0 +1,391 @@
+### File: endgame.py
+### Classes defined: GameValues, EndgameSolver, EndgamePlayer
+###
+### Late in a Konane game the pieces split up into clusters that can
+### never reach each other.  Each cluster is then a separate game, and
+### the whole position is their sum in the sense of combinatorial game
+### theory.  The solver finds the clusters, works out the canonical
+### value of each one (memoised on its normalised local pattern) and
+### adds the values together, instead of searching the whole board.
+###
+### Black is Left and White is Right throughout.
+
+from konane import *
+
+DIRECTIONS = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+# Marks a square that no piece of a region can ever reach.
+WALL = '#'
+
+
+class GameValues:
+    """
+    Builds and compares short partizan games in canonical form.
+
+    Every game is stored once and referred to by an integer id.  A game
+    is a pair of frozensets of option ids, left options first.  Games
+    built with make() are reduced to canonical form, so two equal games
+    always get the same id.
+    """
+    def __init__(self):
+        self.forms = []
+        self.index = {}
+        self.leCache = {}
+        self.sumCache = {}
+        self.zero = self.make((), ())
+
+    def intern(self, left, right):
+        """
+        Returns the id of the game {left | right}, without simplifying it.
+        """
+        key = (frozenset(left), frozenset(right))
+        g = self.index.get(key)
+        if g is None:
+            g = len(self.forms)
+            self.forms.append(key)
+            self.index[key] = g
+        return g
+
+    def leftOptions(self, g):
+        return self.forms[g][0]
+
+    def rightOptions(self, g):
+        return self.forms[g][1]
+
+    def le(self, g, h):
+        """
+        Returns true if g <= h, that is, if Right wins g - h when Left
+        moves first.
+        """
+        if g == h:
+            return True
+        key = (g, h)
+        result = self.leCache.get(key)
+        if result is None:
+            result = not any(self.le(h, gl) for gl in self.leftOptions(g)) \
+                and not any(self.le(hr, g) for hr in self.rightOptions(h))
+            self.leCache[key] = result
+        return result
+
+    def make(self, left, right):
+        """
+        Returns the canonical id of the game {left | right}.  The options
+        must already be canonical.
+        """
+        left = set(left)
+        right = set(right)
+        changed = True
+        while changed:
+            changed = False
+            # Dominated options
+            left = {a for a in left
+                    if not any(b != a and self.le(a, b) for b in left)}
+            right = {a for a in right
+                     if not any(b != a and self.le(b, a) for b in right)}
+            g = self.intern(left, right)
+            # Reversible options
+            for a in list(left):
+                for ar in self.rightOptions(a):
+                    if self.le(ar, g):
+                        left.discard(a)
+                        left |= self.leftOptions(ar)
+                        changed = True
+                        break
+                if changed:
+                    break
+            if changed:
+                continue
+            for a in list(right):
+                for al in self.leftOptions(a):
+                    if self.le(g, al):
+                        right.discard(a)
+                        right |= self.rightOptions(al)
+                        changed = True
+                        break
+                if changed:
+                    break
+        return self.intern(left, right)
+
+    def add(self, g, h):
+        """
+        Returns the canonical id of the sum g + h.
+        """
+        if g == self.zero:
+            return h
+        if h == self.zero:
+            return g
+        key = (g, h) if g < h else (h, g)
+        result = self.sumCache.get(key)
+        if result is None:
+            left = [self.add(gl, h) for gl in self.leftOptions(g)] + \
+                   [self.add(g, hl) for hl in self.leftOptions(h)]
+            right = [self.add(gr, h) for gr in self.rightOptions(g)] + \
+                    [self.add(g, hr) for hr in self.rightOptions(h)]
+            result = self.make(left, right)
+            self.sumCache[key] = result
+        return result
+
+    def wins(self, g, player):
+        """
+        Returns true if player ('B' is Left, 'W' is Right) wins g when
+        moving first.
+        """
+        if player == 'B':
+            return not self.le(g, self.zero)
+        else:
+            return not self.le(self.zero, g)
+
+
+class EndgameSolver:
+    """
+    Solves Konane positions exactly by splitting them into independent
+    regions and summing the regions' game values.
+
+    A square belongs to a region's reach if a piece of that region could
+    ever land on it: starting from the occupied squares, any square with
+    two reachable squares lined up behind it is reachable as well.  Two
+    clusters are independent as long as their reaches neither overlap nor
+    touch, and each region is solved on the bounding box of its reach
+    with every unreachable square walled off.
+    """
+    def __init__(self, size, threshold=12):
+        self.size = size
+        self.threshold = threshold
+        self.values = GameValues()
+        self.cache = {}
+
+    def pieceCount(self, board):
+        """
+        Returns the number of pieces left on the board.
+        """
+        return sum(1 for row in board for cell in row if cell != '.')
+
+    def reach(self, grid, cells):
+        """
+        Returns the set of squares that the pieces on cells could ever
+        occupy, ignoring the colour of the pieces.
+        """
+        height = len(grid)
+        width = len(grid[0])
+        reach = set(cells)
+        frontier = list(cells)
+        while frontier:
+            r, c = frontier.pop()
+            for dr, dc in DIRECTIONS:
+                # (r, c) may be either the first or the middle square of
+                # three in a line.
+                for behind, target in (((r + dr, c + dc), (r + 2*dr, c + 2*dc)),
+                                       ((r - dr, c - dc), (r + dr, c + dc))):
+                    if behind not in reach or target in reach:
+                        continue
+                    r2, c2 = target
+                    if 0 <= r2 < height and 0 <= c2 < width and \
+                       grid[r2][c2] != WALL:
+                        reach.add(target)
+                        frontier.append(target)
+        return reach
+
+    def clusters(self, grid):
+        """
+        Returns the occupied squares of grid grouped into orthogonally
+        connected clusters.
+        """
+        seen = set()
+        result = []
+        for r in range(len(grid)):
+            for c in range(len(grid[0])):
+                if grid[r][c] in '.' + WALL or (r, c) in seen:
+                    continue
+                cluster = []
+                stack = [(r, c)]
+                seen.add((r, c))
+                while stack:
+                    cell = stack.pop()
+                    cluster.append(cell)
+                    for dr, dc in DIRECTIONS:
+                        nr = cell[0] + dr
+                        nc = cell[1] + dc
+                        if 0 <= nr < len(grid) and 0 <= nc < len(grid[0]) \
+                           and (nr, nc) not in seen \
+                           and grid[nr][nc] in 'BW':
+                            seen.add((nr, nc))
+                            stack.append((nr, nc))
+                result.append(cluster)
+        return result
+
+    def touching(self, a, b):
+        """
+        Returns true if the two sets of squares share or border a square.
+        """
+        if len(a) > len(b):
+            a, b = b, a
+        for r, c in a:
+            if (r, c) in b:
+                return True
+            for dr, dc in DIRECTIONS:
+                if (r + dr, c + dc) in b:
+                    return True
+        return False
+
+    def regions(self, grid):
+        """
+        Splits grid (a sequence of equal-length strings) into independent
+        regions.  Each region is returned as a normalised local pattern.
+        Regions holding a single colour can never move and are dropped.
+        """
+        groups = [(cells, self.reach(grid, cells))
+                  for cells in self.clusters(grid)]
+        merged = True
+        while merged:
+            merged = False
+            for i in range(len(groups)):
+                for j in range(i + 1, len(groups)):
+                    if self.touching(groups[i][1], groups[j][1]):
+                        cells = groups[i][0] + groups[j][0]
+                        groups[i] = (cells, self.reach(grid, cells))
+                        del groups[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+        patterns = []
+        for cells, reach in groups:
+            colours = {grid[r][c] for r, c in cells}
+            if len(colours) < 2:
+                continue
+            top = min(r for r, c in reach)
+            bottom = max(r for r, c in reach)
+            left = min(c for r, c in reach)
+            right = max(c for r, c in reach)
+            local = []
+            for r in range(top, bottom + 1):
+                row = ''
+                for c in range(left, right + 1):
+                    row += grid[r][c] if (r, c) in reach else WALL
+                local.append(row)
+            patterns.append(self.normalise(tuple(local)))
+        return patterns
+
+    def normalise(self, pattern):
+        """
+        Returns the smallest of the eight rotations and reflections of the
+        pattern, so that equivalent regions share one cache entry.
+        """
+        best = pattern
+        current = pattern
+        for i in range(4):
+            current = tuple(''.join(row[c] for row in reversed(current))
+                            for c in range(len(current[0])))
+            mirrored = tuple(row[::-1] for row in current)
+            best = min(best, current, mirrored)
+        return best
+
+    def jumps(self, pattern, player):
+        """
+        Returns the patterns that result from every jump available to
+        player in the local pattern.
+        """
+        opponent = 'W' if player == 'B' else 'B'
+        height = len(pattern)
+        width = len(pattern[0])
+        results = []
+        for r in range(height):
+            for c in range(width):
+                if pattern[r][c] != player:
+                    continue
+                for dr, dc in DIRECTIONS:
+                    rows = [list(row) for row in pattern]
+                    rows[r][c] = '.'
+                    r1, c1 = r, c
+                    while 0 <= r1 + 2*dr < height and 0 <= c1 + 2*dc < width \
+                          and rows[r1 + dr][c1 + dc] == opponent \
+                          and rows[r1 + 2*dr][c1 + 2*dc] == '.':
+                        rows[r1 + dr][c1 + dc] = '.'
+                        r1 += 2*dr
+                        c1 += 2*dc
+                        rows[r1][c1] = player
+                        results.append(tuple(''.join(row) for row in rows))
+                        rows[r1][c1] = '.'
+        return results
+
+    def gridValue(self, grid):
+        """
+        Returns the game value of an arbitrary grid as the sum of the
+        values of its regions.
+        """
+        total = self.values.zero
+        for pattern in self.regions(grid):
+            total = self.values.add(total, self.regionValue(pattern))
+        return total
+
+    def regionValue(self, pattern):
+        """
+        Returns the canonical value of a single region.
+        """
+        value = self.cache.get(pattern)
+        if value is None:
+            left = [self.gridValue(p) for p in self.jumps(pattern, 'B')]
+            right = [self.gridValue(p) for p in self.jumps(pattern, 'W')]
+            value = self.values.make(left, right)
+            self.cache[pattern] = value
+        return value
+
+    def value(self, board):
+        """
+        Returns the game value of a Konane board.
+        """
+        return self.gridValue(tuple(''.join(row) for row in board))
+
+    def solve(self, board, player):
+        """
+        Returns true if player wins the board when it is their turn to move.
+        """
+        return self.values.wins(self.value(board), player)
+
+    def probe(self, board, player):
+        """
+        Returns the exact result for player to move if the board is past the
+        opening and has no more than threshold pieces, and None otherwise.
+        """
+        if self.pieceCount(board) > self.threshold:
+            return None
+        if sum(1 for row in board for cell in row if cell == '.') <= 1:
+            return None
+        return self.solve(board, player)
+
+    def bestMove(self, game, board, player):
+        """
+        Returns a move that keeps a won position won for player, or the
+        first legal move if the position is lost.  Returns [] when player
+        has no move.
+        """
+        moves = game.generateMoves(board, player)
+        for move in moves:
+            after = self.value(game.nextBoard(board, player, move))
+            if player == 'B' and self.values.le(self.values.zero, after):
+                return move
+            if player == 'W' and self.values.le(after, self.values.zero):
+                return move
+        return moves[0] if moves else []
+
+
+class EndgamePlayer(Konane, Player):
+    """
+    Plays perfectly once the board is down to the solver's threshold and
+    picks a random move before that.
+    """
+    def __init__(self, n, threshold=12):
+        Konane.__init__(self, n)
+        self.solver = EndgameSolver(n, threshold)
+
+    def initialize(self, side):
+        self.side = side
+        self.name = "EndgamePlayer"
+
+    def getMove(self, board):
+        if self.solver.probe(board, self.side) is not None:
+            return self.solver.bestMove(self, board, self.side)
+        moves = self.generateMoves(board, self.side)
+        if not moves:
+            return []
+        return moves[random.randrange(0, len(moves))]
@@ -351,12 +351,13 @@ class HoundsAndHare:
 
         return False
     
-    def playOneGame(self, p1, p2, show):
+    def playOneGame(self, p1, p2, show, adjudicator=None):
         """
         Given two instances of players, will play out a game
         between them.  Returns 'O' if the Hounds win, or 'A' if
         the Hare wins. When show is true, it will display each move
-        in the game.
+        in the game.  An adjudicator (see adjudicate.py) ends the
+        game as soon as it can prove the result.
         """        
         self.reset()
         p1.initialize('O')
@@ -368,6 +369,12 @@ class HoundsAndHare:
                 break
             if show:
                 print ("\nPlayer Hounds's turn")
+            if adjudicator is not None:
+                result = adjudicator.winner(self, 'O')
+                if result is not None:
+                    if show:
+                        print ("Adjudicated:", result, "wins")
+                    break
             try:
                 move = p1.getMove(self.board)
             except Exception as e:
@@ -397,6 +404,12 @@ class HoundsAndHare:
                 print
                 print(self)
                 print ("\nPlayer Hare's turn")
+            if adjudicator is not None:
+                result = adjudicator.winner(self, 'A')
+                if result is not None:
+                    if show:
+                        print ("Adjudicated:", result, "wins")
+                    break
             try:
                 move = p2.getMove(self.board)
             except Exception as e:
@@ -423,19 +436,20 @@ class HoundsAndHare:
             print ("Game over")
         return result
     
-    def playNGames(self, n, p1, p2, show):
+    def playNGames(self, n, p1, p2, show, adjudicator=None):
         """
         Will play out n games between player p1 and player p2.
         The players alternate going first.  Prints the total
-        number of games won by each player.
+        number of games won by each player.  adjudicator is passed
+        on to playOneGame.
         """
         first = p1
         second = p2
         for i in range(n):
             print ("Game", i + 1)
-            winner = self.playOneGame(first, second, show)
+            winner = self.playOneGame(first, second, show, adjudicator)
             side = {'A': 'Hare', 'O': 'Hound'}
-            if winner == 'B':
+            if winner == first.side:
                 first.won()
                 second.lost()
                 print (f"{first.name} ({side[first.side]}) wins!")
@@ -231,12 +231,13 @@ class Konane:
                                                 self.opponent(player))
             return moves
 
-    def playOneGame(self, p1, p2, show):
+    def playOneGame(self, p1, p2, show, adjudicator=None):
         """
         Given two instances of players, will play out a game
         between them.  Returns 'B' if black wins, or 'W' if
         white wins. When show is true, it will display each move
-        in the game.
+        in the game.  An adjudicator (see adjudicate.py) ends the
+        game as soon as it can prove the result.
         """
         self.reset()
         p1.initialize('B')
@@ -246,6 +247,12 @@ class Konane:
             if show:
                 print (self)
                 print ("player B's turn")
+            if adjudicator is not None:
+                result = adjudicator.winner(self, 'B')
+                if result is not None:
+                    if show:
+                        print ("adjudicated: player", result, "wins")
+                    break
             try:
                 move = p1.getMove(self.board)
             except Exception as e:
@@ -265,6 +272,12 @@ class Konane:
                 print
                 print (self)
                 print ("player W's turn")
+            if adjudicator is not None:
+                result = adjudicator.winner(self, 'W')
+                if result is not None:
+                    if show:
+                        print ("adjudicated: player", result, "wins")
+                    break
             try:
                 move = p2.getMove(self.board)
             except Exception as e:
@@ -286,17 +299,18 @@ class Konane:
             print ("Game over")
         return result
 
-    def playNGames(self, n, p1, p2, show):
+    def playNGames(self, n, p1, p2, show, adjudicator=None):
         """
         Will play out n games between player p1 and player p2.
         The players alternate going first.  Prints the total
-        number of games won by each player.
+        number of games won by each player.  adjudicator is passed
+        on to playOneGame.
         """
         first = p1
         second = p2
         for i in range(n):
             print ("Game", i)
-            winner = self.playOneGame(first, second, show)
+            winner = self.playOneGame(first, second, show, adjudicator)
             if winner == 'B':
                 first.won()
                 second.lost()
@@ -396,5 +410,6 @@ class SimplePlayer(Konane, Player):
             return moves[0]
 
 
-game = Konane(8)
-game.playNGames(1, SimplePlayer(8), RandomPlayer(8), 1)
+if __name__ == "__main__":
+    game = Konane(8)
+    game.playNGames(1, SimplePlayer(8), RandomPlayer(8), 1)
@@ -0,0 +1,212 @@
+### File: matchrunner.py
+### Classes defined: MatchWorker, MatchRunner
+###
+### Long matches between two players, run in a pool of worker processes
+### that a supervisor watches.  Every worker builds its game and both
+### players once, when it starts, and then plays one game per task.  A
+### worker whose game runs past the time limit, whose memory grows past
+### the limit or that dies is killed and replaced, and its game is
+### reported as failed; the match goes on with the other workers.
+### Workers are also replaced after a fixed number of games, so slow
+### leaks never build up.
+###
+### Each worker has its own pipe to the supervisor rather than sharing a
+### multiprocessing.Queue, because killing a process while it holds a
+### queue's lock would hang every other worker.
+
+import contextlib
+import io
+import multiprocessing
+import time
+import traceback
+from multiprocessing import connection
+
+from memprof import currentRSS
+
+
+def serve(conn, makeGame, makePlayers, makeAdjudicator):
+    """
+    The body of a worker process: builds the game and the players, then
+    plays the game index it is sent until it is sent None.  Players swap
+    sides on odd games, as in playNGames.
+    """
+    game = makeGame()
+    players = makePlayers()
+    adjudicator = makeAdjudicator() if makeAdjudicator is not None else None
+    conn.send(('ready', None))
+    while True:
+        index = conn.recv()
+        if index is None:
+            return
+        first = index % 2
+        start = time.time()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                side = game.playOneGame(players[first], players[1 - first],
+                                        False, adjudicator)
+        except Exception:
+            conn.send(('done', {'game': index, 'status': 'error',
+                                'winner': None, 'side': None,
+                                'seconds': time.time() - start,
+                                'error': traceback.format_exc()}))
+            continue
+        winner = first if side == players[first].side else 1 - first
+        conn.send(('done', {'game': index, 'status': 'ok', 'winner': winner,
+                            'side': side, 'seconds': time.time() - start}))
+
+
+class MatchWorker:
+    """
+    One worker process, its end of the pipe and the game it is playing.
+    """
+    def __init__(self, context, factories):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=serve,
+                                       args=(child,) + factories,
+                                       daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+        self.task = None
+        self.started = None
+        self.games = 0
+
+    def assign(self, index):
+        self.task = index
+        self.started = time.time()
+        self.conn.send(index)
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.process.join(None if kill else 5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class MatchRunner:
+    """
+    Plays matches between the two players built by makePlayers, a
+    function returning [p1, p2], on the game built by makeGame.  Both
+    factories (and makeAdjudicator, if given) are called in the worker
+    processes, which are forked, so they need not be picklable.
+
+    timeout is the most seconds one game may take, memoryLimit the most
+    bytes a worker may use (checked on Linux only) and gamesPerWorker the
+    number of games a worker plays before it is replaced.
+    """
+    def __init__(self, makeGame, makePlayers, workers=None, timeout=None,
+                 memoryLimit=None, gamesPerWorker=100, makeAdjudicator=None,
+                 poll=0.1):
+        self.factories = (makeGame, makePlayers, makeAdjudicator)
+        self.size = workers or multiprocessing.cpu_count()
+        self.timeout = timeout
+        self.memoryLimit = memoryLimit
+        self.gamesPerWorker = gamesPerWorker
+        self.poll = poll
+        self.context = multiprocessing.get_context('fork')
+        self.restarts = 0
+        self.workers = [MatchWorker(self.context, self.factories)
+                        for i in range(self.size)]
+
+    def replace(self, worker, kill):
+        worker.stop(kill)
+        self.workers[self.workers.index(worker)] = \
+            MatchWorker(self.context, self.factories)
+        self.restarts += 1
+
+    def failure(self, worker, status):
+        return {'game': worker.task, 'status': status, 'winner': None,
+                'side': None, 'seconds': time.time() - worker.started}
+
+    def check(self, worker):
+        """
+        Returns why a busy worker has to be killed, or None.
+        """
+        if not worker.process.is_alive():
+            return 'crashed'
+        if self.timeout is not None and \
+           time.time() - worker.started > self.timeout:
+            return 'timeout'
+        if self.memoryLimit is not None and \
+           currentRSS(worker.process.pid) > self.memoryLimit:
+            return 'memory'
+        return None
+
+    def run(self, n):
+        """
+        Plays n games and yields a result dict for each as it finishes:
+        game is its index, status 'ok', 'error', 'timeout', 'memory' or
+        'crashed', winner 0 or 1 for the player that won (None if the game
+        failed), side the winning side and seconds the time it took.
+        """
+        tasks = list(range(n - 1, -1, -1))
+        remaining = n
+        while remaining:
+            for worker in self.workers:
+                if worker.ready and worker.task is None and tasks:
+                    worker.assign(tasks.pop())
+            byConn = {worker.conn: worker for worker in self.workers}
+            for conn in connection.wait(list(byConn), self.poll):
+                worker = byConn[conn]
+                try:
+                    kind, result = conn.recv()
+                except (EOFError, OSError):
+                    continue
+                if kind == 'ready':
+                    worker.ready = True
+                    continue
+                worker.task = None
+                worker.games += 1
+                remaining -= 1
+                yield result
+                if worker.games >= self.gamesPerWorker:
+                    self.replace(worker, False)
+            for worker in list(self.workers):
+                if worker.task is not None:
+                    status = self.check(worker)
+                    if status is not None:
+                        remaining -= 1
+                        yield self.failure(worker, status)
+                        self.replace(worker, True)
+                elif not worker.process.is_alive():
+                    if not worker.ready:
+                        raise RuntimeError("match worker failed to start")
+                    self.replace(worker, True)
+
+    def play(self, n):
+        """
+        Plays n games and returns [p1 wins, p2 wins, failed games].
+        """
+        totals = [0, 0, 0]
+        for result in self.run(n):
+            totals[2 if result['winner'] is None else result['winner']] += 1
+        return totals
+
+    def close(self):
+        for worker in self.workers:
+            worker.stop()
+        self.workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+if __name__ == "__main__":
+    import harev2
+    from minimax import MinimaxPlayer
+    with MatchRunner(harev2.HoundsAndHare,
+                     lambda: [MinimaxPlayer(4), harev2.RandomPlayer()],
+                     timeout=60, memoryLimit=512 * 2**20) as runner:
+        print (runner.play(100))
@@ -0,0 +1,214 @@
+### File: memprof.py
+### Classes defined: MemoryProfiler
+###
+### Memory instrumentation for searches and matches.  tracemalloc gives
+### the Python-level picture (bytes and blocks allocated, and where),
+### and a sampler thread tracks the resident set size of the process,
+### which is what gets a worker OOM-killed.  Reports are plain dicts so
+### they can be saved as JSON and compared against a baseline by
+### checkRegression in benchmark runs.
+
+import contextlib
+import io
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+
+from search import WIN
+
+
+def currentRSS(pid='self'):
+    """
+    Returns the resident set size in bytes of this process, or of
+    process pid.  Without /proc, another process's size is reported as 0.
+    """
+    try:
+        with open('/proc/' + str(pid) + '/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        if pid != 'self':
+            return 0
+        # ru_maxrss is the peak, in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class MemoryProfiler:
+    """
+    Traces allocations and samples RSS while active.  Use as a context
+    manager; afterwards peakRSS holds the largest RSS seen and
+    topSites(n) the allocation sites holding the most memory that was
+    allocated while the profiler ran.
+    """
+    def __init__(self, frames=10, interval=0.01):
+        self.frames = frames
+        self.interval = interval
+        self.peakRSS = 0
+        self.running = False
+
+    def __enter__(self):
+        self.wasTracing = tracemalloc.is_tracing()
+        if not self.wasTracing:
+            tracemalloc.start(self.frames)
+        self.start = tracemalloc.take_snapshot()
+        self.startRSS = currentRSS()
+        self.peakRSS = self.startRSS
+        self.running = True
+        self.sampler = threading.Thread(target=self.sample, daemon=True)
+        self.sampler.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.running = False
+        self.sampler.join()
+        self.end = tracemalloc.take_snapshot()
+        if not self.wasTracing:
+            tracemalloc.stop()
+        return False
+
+    def sample(self):
+        while self.running:
+            self.peakRSS = max(self.peakRSS, currentRSS())
+            time.sleep(self.interval)
+
+    def topSites(self, n=10):
+        """
+        Returns [(site, bytes, blocks)] for the n sites whose live memory
+        grew the most while the profiler ran.
+        """
+        stats = self.end.compare_to(self.start, 'lineno')
+        return [(str(stat.traceback), stat.size_diff, stat.count_diff)
+                for stat in stats[:n]]
+
+
+def profileSearch(engine, state, depth, top=10):
+    """
+    Runs engine (a SearchEngine) on state one depth at a time, and
+    reports memory for each depth: the nodes searched, the peak traced
+    bytes above the starting point, the bytes and blocks still held
+    afterwards (mostly the transposition table) and those figures per
+    node.
+    """
+    plies = []
+    with MemoryProfiler() as profiler:
+        for d in range(1, depth + 1):
+            tracemalloc.reset_peak()
+            before, peak = tracemalloc.get_traced_memory()
+            blocksBefore = sum(stat.count for stat in
+                               tracemalloc.take_snapshot().statistics('filename'))
+            nodes = engine.nodes
+            engine.negamax(state, d, -WIN - 1, WIN + 1, 0)
+            nodes = max(1, engine.nodes - nodes)
+            after, peak = tracemalloc.get_traced_memory()
+            blocksAfter = sum(stat.count for stat in
+                              tracemalloc.take_snapshot().statistics('filename'))
+            plies.append({
+                'depth': d,
+                'nodes': nodes,
+                'peakBytes': peak - before,
+                'retainedBytes': after - before,
+                'retainedBlocks': blocksAfter - blocksBefore,
+                'peakBytesPerNode': (peak - before) / nodes,
+                'blocksPerNode': (blocksAfter - blocksBefore) / nodes,
+            })
+    return {
+        'plies': plies,
+        'peakBytes': max(p['peakBytes'] for p in plies),
+        'peakRSS': profiler.peakRSS,
+        'rssGrowth': profiler.peakRSS - profiler.startRSS,
+        'topSites': profiler.topSites(top),
+    }
+
+
+def profileGames(game, p1, p2, n, top=10):
+    """
+    Plays n games between p1 and p2 (alternating who goes first, with the
+    games' output suppressed) and reports the peak traced bytes of each
+    game along with the overall peak RSS and top allocation sites.
+    """
+    games = []
+    with MemoryProfiler() as profiler:
+        first, second = p1, p2
+        for i in range(n):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            with contextlib.redirect_stdout(io.StringIO()):
+                game.playOneGame(first, second, False)
+            current, peak = tracemalloc.get_traced_memory()
+            games.append({'peakBytes': peak - before,
+                          'retainedBytes': current - before})
+            first, second = second, first
+    return {
+        'games': games,
+        'peakBytes': max(g['peakBytes'] for g in games),
+        'peakRSS': profiler.peakRSS,
+        'rssGrowth': profiler.peakRSS - profiler.startRSS,
+        'topSites': profiler.topSites(top),
+    }
+
+
+def formatReport(report):
+    lines = [f"peak traced: {report['peakBytes']} bytes, "
+             f"peak RSS: {report['peakRSS']} bytes "
+             f"(+{report['rssGrowth']})"]
+    for p in report.get('plies', []):
+        lines.append(f"depth {p['depth']}: {p['nodes']} nodes, "
+                     f"peak {p['peakBytes']} bytes "
+                     f"({p['peakBytesPerNode']:.1f}/node), "
+                     f"retained {p['retainedBytes']} bytes "
+                     f"({p['blocksPerNode']:.2f} blocks/node)")
+    for i, g in enumerate(report.get('games', [])):
+        lines.append(f"game {i}: peak {g['peakBytes']} bytes, "
+                     f"retained {g['retainedBytes']} bytes")
+    for site, size, count in report['topSites']:
+        lines.append(f"{site}: {size} bytes in {count} blocks")
+    return '\n'.join(lines)
+
+
+REGRESSION_KEYS = ('peakBytes', 'rssGrowth')
+
+
+def checkRegression(report, baselinePath, tolerance=0.1):
+    """
+    Compares a report with a saved baseline report.  Returns a list of
+    (key, baseline, current) for every figure more than tolerance above
+    its baseline; an empty list means no regression.
+    """
+    with open(baselinePath) as f:
+        baseline = json.load(f)
+    failures = []
+    for key in REGRESSION_KEYS:
+        if report[key] > baseline[key] * (1 + tolerance) + 4096:
+            failures.append((key, baseline[key], report[key]))
+    for old, new in zip(baseline.get('plies', []), report.get('plies', [])):
+        if new['peakBytesPerNode'] > old['peakBytesPerNode'] * (1 + tolerance):
+            failures.append(('peakBytesPerNode@' + str(new['depth']),
+                             old['peakBytesPerNode'], new['peakBytesPerNode']))
+    return failures
+
+
+def saveBaseline(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=1)
+
+
+if __name__ == "__main__":
+    # Usage: python memprof.py [baseline.json [--save]]
+    from search import KonaneRules, SearchEngine
+    rules = KonaneRules(8)
+    state = rules.start()
+    for move in ([3, 3, 3, 3], [3, 4, 3, 4]):
+        state = rules.play(state, move)
+    report = profileSearch(SearchEngine(rules), state, 4)
+    print (formatReport(report))
+    if len(sys.argv) > 2 and sys.argv[2] == '--save':
+        saveBaseline(report, sys.argv[1])
+    elif len(sys.argv) > 1:
+        failures = checkRegression(report, sys.argv[1])
+        for failure in failures:
+            print ("REGRESSION", failure)
+        sys.exit(1 if failures else 0)
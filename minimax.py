@@ -2,109 +2,58 @@
 # different heursitics
 
 from harev2 import *
+from search import HareRules, SearchPlayer, makeEngine
 
-class MinimaxPlayer(HoundsAndHare, Player):
+# The terms of MinimaxPlayer.eval, and the weights each side gives them.
+FEATURES = ('passedHounds', 'goalDist', 'moreMoves', 'cumHareDist',
+            'hareTrapped')
+DEFAULT_WEIGHTS = {
+    'A': (1, 1, 0, 0, 0),
+    'O': (-1, 1, 1, 1, 100),
+}
+
+class MinimaxPlayer(HoundsAndHare, SearchPlayer, Player):
     """
     Uses minimax to determine moves
     """
-    def __init__(self, depthLimit):
+    def __init__(self, depthLimit, workers=1, cache=None, ponder=False,
+                 weights=None, mode='alphabeta'):
         HoundsAndHare.__init__(self)
         self.limit = depthLimit
+        self.weights = dict(DEFAULT_WEIGHTS)
+        if weights is not None:
+            self.weights.update(weights)
+        self.ponder = ponder
+        self.rules = HareRules()
+        self.engine = makeEngine(self.rules, self.evaluate, workers, cache,
+                                 mode, namespace=self.cacheNamespace)
 
     def initialize(self, side):
+        """
+        The evaluation depends on the side played, so the search table
+        is emptied whenever the side changes.
+        """
+        self.stopPondering()
+        if getattr(self, 'side', side) != side:
+            self.engine.clear()
         self.side = side
         self.name = "MinimaxPlayer"
 
 
-    def max(self, board, depth):
-        moves = self.generateMoves(board, self.side)
-        bestMove = 0
-        currentMove = -float("inf")
-
-        if depth > self.depthLimit:
-            return self.eval(board)
-
-        for move in moves:
-            bestVal = (self.min(self.nextBoard(board, self.side, move), depth+1))
-            if bestVal > currentMove:
-                currentMove = bestVal
-                bestMove = move
-
-        return currentMove, bestMove
-
-    def min(self, board, depth):
-        moves = self.generateMoves(board, self.side)
-        bestMove = 0
-        currentMove = float("inf")
-
-        if depth > self.depthLimit:
-            return self.eval(board)
-
-        for move in moves:
-            bestVal = (self.max(self.nextBoard(board, self.side, move), depth+1))
-            if bestVal > currentMove:
-                currentMove = bestVal
-                bestMove = move
-
-        return currentMove, bestMove  
-                
-
-    def getMove(self, board):
-        moves = self.generateMoves(board, self.side)
-        if not moves:
-            return []
-
-        value = []
-        alpha = -float("inf")
-        for move in moves:
-            value.append(self.minimax(self.nextBoard(board, self.side, move), 1, alpha, float("inf")))
-            if max(value) > alpha:
-                alpha = max(value)
-        return moves[value.index(max(value))]
-
-    def minimax(self, board, depth, alpha, beta):
-        if depth >= self.limit:
-            return self.eval(board)
-        isMax = depth % 2 == 0
-        if isMax:
-            next_boards = self.helper(board, self.side)
-        else:
-            next_boards = self.helper(board, self.switch_turn())
-
-        if not next_boards:
-            if isMax:
-                return -float("inf")
-            else:
-                return float("inf")
-        value = []
-        new_alpha = alpha
-        new_beta = beta
-        for next_board in next_boards:
-            if value:
-                if isMax:
-                    if max(value) >= beta:
-                        break
-                    if max(value) > alpha:
-                        new_alpha = max(value)
-                else:
-                    if min(value) <= alpha:
-                        break
-                    if min(value) < beta:
-                        new_beta = min(value)
-
-            value.append(self.minimax(next_board, depth+1, new_alpha, new_beta))
-
-        if isMax:
-            return max(value)
-        else:
-            return min(value)
+    def cacheNamespace(self):
+        """
+        Names the evaluation for a PositionCache: it depends on the side
+        played and on that side's weights.
+        """
+        return 'minimax/' + self.side + repr(tuple(self.weights[self.side]))
 
-    def helper(self, board, side):
-        moves = self.generateMoves(board, side)
-        boards = []
-        for move in moves:
-            boards.append(self.nextBoard(board, side, move))
-        return boards
+    def evaluate(self, state):
+        """
+        Scores a search state for the side to move using eval, which
+        scores boards for this player.
+        """
+        score = self.eval(state[0])
+        return score if state[1] == self.side else -score
 
     def distanceBetween(self, board, p1, p2):
         """
@@ -122,14 +71,15 @@ class MinimaxPlayer(HoundsAndHare, Player):
         return sum(abs(val1-val2) for val1, val2 in zip(p1Loc, p2Loc))
 
 
-    def eval(self, board):
+    def features(self, board):
+        """
+        The heuristic terms that eval combines, in the order of
+        FEATURES.
+        """
         #      ----- Generalized Heursistics -----
 
-        # How many possible next does this move give the player
-        moves = len(self.generateMoves(board, self.side))
-    
         # How many more moves than the player's opponent
-        moreMoves = (len(self.generateMoves(board, self.side))) - (len(self.generateMoves(board, self.opponent)))
+        moreMoves = (len(self.generateMoves(board, self.side))) - (len(self.generateMoves(board, self.opponent(self.side))))
 
         #      -----      Hare Specific      -----
 
@@ -146,10 +96,10 @@ class MinimaxPlayer(HoundsAndHare, Player):
         #      -----     Hound Specific      -----
 
         # Check if the hare will be trapped
-        if self.generateHareMoves(board) == 0:
-            hareTrapped = 100
+        if len(self.generateHareMoves(board)) == 0:
+            hareTrapped = 1
         else:
-            hareTrapped = -100
+            hareTrapped = -1
 
         # Proximity to eachother
 
@@ -159,14 +109,17 @@ class MinimaxPlayer(HoundsAndHare, Player):
         for dawg in doggies:
             cumHareDist += self.distanceBetween(board, dawg, 'A')
 
-        ##################################################
+        return [passedHounds, goalDist, moreMoves, cumHareDist, hareTrapped]
 
-        if self.side == 'A':
-            return (passedHounds + -abs(goalDist))
-        else:
-            return (-abs(passedHounds) + moreMoves + cumHareDist + goalDist + hareTrapped)
+    def eval(self, board):
+        """
+        The weighted sum of the features, using this side's weights.
+        """
+        weights = self.weights[self.side]
+        return sum(w * f for w, f in zip(weights, self.features(board)))
 
-game = HoundsAndHare()
-game.playNGames(100, MinimaxPlayer(5), SimplePlayer(), False)
+if __name__ == "__main__":
+    game = HoundsAndHare()
+    game.playNGames(100, MinimaxPlayer(5), SimplePlayer(), False)
 
 # The Hounds REFUSE to win
\ No newline at end of file
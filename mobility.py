@@ -0,0 +1,109 @@
+### File: mobility.py
+### Classes defined: MobilityEvaluator
+###
+### Konane evaluation in one pass over the board.  Scoring mobility with
+### generateMoves builds both sides' full move lists through the
+### recursive check; here the board is flattened once and each piece
+### looks along precomputed rays in the four directions, which gives the
+### move counts and the other features below in a single loop.
+
+# The features, each for the side to move and then its opponent:
+#   moves       legal moves, counting every length of multiple jump
+#   potential   jumps over an adjacent enemy piece whose landing square
+#               is on the board but occupied, so a later move may open it
+#   safe        pieces with no empty square next to them, which cannot be
+#               jumped until a neighbour leaves
+#   vulnerable  pieces the opponent can jump right now
+FEATURES = ('moves', 'oppMoves', 'potential', 'oppPotential',
+            'safe', 'oppSafe', 'vulnerable', 'oppVulnerable')
+
+# Plain mobility: the side to move's moves less the opponent's.
+DEFAULT_WEIGHTS = (1, -1, 0, 0, 0, 0, 0, 0)
+
+
+class MobilityEvaluator:
+    """
+    Computes FEATURES for n x n Konane boards and scores them with a
+    weight per feature.
+    """
+    def __init__(self, size, weights=DEFAULT_WEIGHTS):
+        self.size = size
+        self.weights = tuple(weights)
+        n = size
+        # rays[s][d] lists the squares from s outwards in direction d
+        # (up, right, down, left); (d + 2) % 4 is the opposite direction.
+        self.rays = []
+        for s in range(n * n):
+            r, c = divmod(s, n)
+            rays = []
+            for dr, dc in ((-1, 0), (0, 1), (1, 0), (0, -1)):
+                ray = []
+                rr, cc = r + dr, c + dc
+                while 0 <= rr < n and 0 <= cc < n:
+                    ray.append(rr * n + cc)
+                    rr += dr
+                    cc += dc
+                rays.append(tuple(ray))
+            self.rays.append(tuple(rays))
+        self.rays = tuple(self.rays)
+
+    def counts(self, board):
+        """
+        Returns {side: [moves, potential, safe, vulnerable]} for both
+        sides of a board past the opening.
+        """
+        cells = ''.join(''.join(row) for row in board)
+        counts = {'B': [0, 0, 0, 0], 'W': [0, 0, 0, 0]}
+        for s, piece in enumerate(cells):
+            if piece == '.':
+                continue
+            opponent = 'W' if piece == 'B' else 'B'
+            count = counts[piece]
+            rays = self.rays[s]
+            enclosed = True
+            jumpable = False
+            for d in range(4):
+                ray = rays[d]
+                if not ray:
+                    continue
+                near = cells[ray[0]]
+                if near == '.':
+                    enclosed = False
+                    back = rays[(d + 2) % 4]
+                    if back and cells[back[0]] == opponent:
+                        jumpable = True
+                elif near == opponent and len(ray) > 1:
+                    if cells[ray[1]] != '.':
+                        count[1] += 1
+                        continue
+                    k = 0
+                    while k + 1 < len(ray) and cells[ray[k]] == opponent \
+                          and cells[ray[k + 1]] == '.':
+                        count[0] += 1
+                        k += 2
+            if enclosed:
+                count[2] += 1
+            if jumpable:
+                count[3] += 1
+        return counts
+
+    def features(self, game, board, player):
+        """
+        Returns the FEATURES of board with player to move.  During the
+        opening removals the move counts come from game.generateMoves.
+        """
+        counts = self.counts(board)
+        mine = counts[player]
+        theirs = counts[game.opponent(player)]
+        if game.openingMove(board):
+            mine[0] = len(game.generateMoves(board, player))
+            theirs[0] = len(game.generateMoves(board, game.opponent(player)))
+        return (mine[0], theirs[0], mine[1], theirs[1],
+                mine[2], theirs[2], mine[3], theirs[3])
+
+    def score(self, game, board, player):
+        """
+        Returns the weighted sum of the features for player to move.
+        """
+        return sum(w * f for w, f in
+                   zip(self.weights, self.features(game, board, player)))
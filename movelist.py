@@ -0,0 +1,166 @@
+### File: movelist.py
+### Classes defined: MoveList
+###
+### Incremental move generation for Konane.  Every jump runs along one
+### row or one column, so legal moves are kept per line: line i is row i
+### and line n + i is column i.  A move changes squares on a single line,
+### and the only moves it can create or destroy are those on that line
+### and on the lines crossing the squares it changed, so only those
+### lines are scanned again instead of the whole board.
+
+import functools
+
+SIDES = ('B', 'W')
+
+
+@functools.lru_cache(maxsize=None)
+def lines(n):
+    """
+    Returns the 2n lines of an n x n board as tuples of (row, col).
+    """
+    rows = [tuple((r, c) for c in range(n)) for r in range(n)]
+    columns = [tuple((r, c) for r in range(n)) for c in range(n)]
+    return tuple(rows + columns)
+
+
+def changedSquares(move):
+    """
+    Returns the squares a move changes: the start, every jumped piece
+    and every square passed through, up to and including the landing.
+    """
+    r1, c1, r2, c2 = move
+    dr = (r2 > r1) - (r2 < r1)
+    dc = (c2 > c1) - (c2 < c1)
+    squares = [(r1, c1)]
+    r, c = r1, c1
+    while (r, c) != (r2, c2):
+        r += dr
+        c += dc
+        squares.append((r, c))
+    return squares
+
+
+def touchedLines(n, move):
+    """
+    Returns the indexes of the lines whose moves a move can change.
+    """
+    touched = set()
+    for r, c in changedSquares(move):
+        touched.add(r)
+        touched.add(n + c)
+    return touched
+
+
+def scanLine(board, line, player, opponent):
+    """
+    Returns a tuple of player's jumps along one line.
+    """
+    moves = []
+    length = len(line)
+    for i, (r, c) in enumerate(line):
+        if board[r][c] != player:
+            continue
+        for d in (1, -1):
+            k = i + d
+            while 0 <= k + d < length:
+                jr, jc = line[k]
+                lr, lc = line[k + d]
+                if board[jr][jc] != opponent or board[lr][lc] != '.':
+                    break
+                moves.append([r, c, lr, lc])
+                k += 2 * d
+    return tuple(moves)
+
+
+def scanBoard(board, n):
+    """
+    Returns (lines of black moves, lines of white moves), each a tuple
+    with one tuple of moves per line.
+    """
+    return tuple(tuple(scanLine(board, line, side, other)
+                       for line in lines(n))
+                 for side, other in (('B', 'W'), ('W', 'B')))
+
+
+def rescan(board, n, moveLines, touched):
+    """
+    Returns moveLines (as from scanBoard) with the touched lines scanned
+    again on board.
+    """
+    result = []
+    for side, other, perLine in zip(SIDES, reversed(SIDES), moveLines):
+        perLine = list(perLine)
+        for index in touched:
+            perLine[index] = scanLine(board, lines(n)[index], side, other)
+        result.append(tuple(perLine))
+    return tuple(result)
+
+
+class MoveList:
+    """
+    A Konane board with both sides' legal moves kept up to date.  play()
+    makes a move on the board in place and updates the moves of the
+    lines it touched; undo() takes back the last move.  The move lists
+    returned share their moves with the tables, so they must not be
+    changed.  While the game is in its opening removals the moves come
+    from the game's own generator.
+    """
+    def __init__(self, game, board):
+        self.game = game
+        self.n = game.size
+        self.board = [list(row) for row in board]
+        self.blanks = game.countSymbol(self.board, '.')
+        self.lines = {side: list(perLine) for side, perLine in
+                      zip(SIDES, scanBoard(self.board, self.n))}
+        self.counts = {side: sum(len(moves) for moves in self.lines[side])
+                       for side in SIDES}
+        self.history = []
+
+    def moves(self, player):
+        if self.blanks <= 1:
+            return self.game.generateMoves(self.board, player)
+        return [move for moves in self.lines[player] for move in moves]
+
+    def count(self, player):
+        """
+        Returns the number of legal moves player has.
+        """
+        if self.blanks <= 1:
+            return len(self.game.generateMoves(self.board, player))
+        return self.counts[player]
+
+    def play(self, player, move):
+        """
+        Makes a legal move for player.
+        """
+        board = self.board
+        squares = changedSquares(move)
+        changes = [(r, c, board[r][c]) for r, c in squares]
+        for r, c in squares:
+            board[r][c] = '.'
+        if len(squares) > 1:
+            board[move[2]][move[3]] = player
+        blanks = self.blanks
+        self.blanks += max(1, len(squares) // 2)
+        saved = []
+        for index in touchedLines(self.n, move):
+            line = lines(self.n)[index]
+            for side, other in (('B', 'W'), ('W', 'B')):
+                old = self.lines[side][index]
+                new = scanLine(board, line, side, other)
+                saved.append((side, index, old))
+                self.lines[side][index] = new
+                self.counts[side] += len(new) - len(old)
+        self.history.append((changes, saved, blanks))
+
+    def undo(self):
+        """
+        Takes back the last move played.
+        """
+        changes, saved, blanks = self.history.pop()
+        for r, c, symbol in changes:
+            self.board[r][c] = symbol
+        for side, index, old in saved:
+            self.counts[side] += len(old) - len(self.lines[side][index])
+            self.lines[side][index] = old
+        self.blanks = blanks
@@ -0,0 +1,142 @@
+### File: packed.py
+### Classes defined: PackedKonanePlayer, PackedHarePlayer
+###
+### Compact integer moves for both games.  A Konane move [r1, c1, r2, c2]
+### packs into 16 bits, four bits per coordinate, so boards of up to 15
+### squares a side are supported.  A Hounds and Hare move [from, to]
+### packs into 8 bits.  Move lists come back as array buffers instead of
+### lists of lists, and the adapters below turn a player that answers
+### with packed moves back into an ordinary Player.
+
+from array import array
+
+import harev2
+import konane
+
+KONANE_NO_MOVE = 0xFFFF
+HARE_NO_MOVE = 0xFF
+
+DIRECTIONS = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+
+def packKonane(move):
+    """
+    Packs a Konane move [r1, c1, r2, c2] into an int.
+    """
+    return (move[0] << 12) | (move[1] << 8) | (move[2] << 4) | move[3]
+
+
+def unpackKonane(code):
+    """
+    Returns the Konane move list for a packed move.
+    """
+    return [code >> 12, (code >> 8) & 15, (code >> 4) & 15, code & 15]
+
+
+def packHare(move):
+    """
+    Packs a Hounds and Hare move [from, to] into an int.
+    """
+    return (move[0] << 4) | move[1]
+
+
+def unpackHare(code):
+    """
+    Returns the Hounds and Hare move list for a packed move.
+    """
+    return [code >> 4, code & 15]
+
+
+def konaneMoves(game, board, player):
+    """
+    Returns the legal moves for player as an array of packed moves, in the
+    same order as Konane.generateMoves.
+    """
+    if game.openingMove(board):
+        if player == 'B':
+            moves = game.generateFirstMoves(board)
+        else:
+            moves = game.generateSecondMoves(board)
+        return array('H', [packKonane(move) for move in moves])
+    opponent = game.opponent(player)
+    size = game.size
+    moves = array('H')
+    for r in range(size):
+        row = board[r]
+        for c in range(size):
+            if row[c] != player:
+                continue
+            for dr, dc in DIRECTIONS:
+                r1 = r + dr
+                c1 = c + dc
+                r2 = r1 + dr
+                c2 = c1 + dc
+                while 0 <= r2 < size and 0 <= c2 < size and \
+                      board[r1][c1] == opponent and board[r2][c2] == '.':
+                    moves.append((r << 12) | (c << 8) | (r2 << 4) | c2)
+                    r1 = r2 + dr
+                    c1 = c2 + dc
+                    r2 = r1 + dr
+                    c2 = c1 + dc
+    return moves
+
+
+def hareMoves(game, board, player):
+    """
+    Returns the legal moves for player ('A' or 'O') as an array of packed
+    moves, in the same order as HoundsAndHare.generateMoves.
+    """
+    moves = array('B')
+    if player == 'A':
+        pieces = ('A',)
+    else:
+        pieces = ('h1', 'h2', 'h3')
+        player = 'O'
+    for piece in pieces:
+        pos = board.index(piece)
+        for new_pos in harev2.EDGES[pos]:
+            if game.can_move(board, player, pos, new_pos):
+                moves.append((pos << 4) | new_pos)
+    return moves
+
+
+class PackedKonanePlayer(konane.Player):
+    """
+    Wraps a Konane player whose getMove returns a packed move, or
+    KONANE_NO_MOVE to concede, so that it can be used anywhere a list
+    move is expected.
+    """
+    def __init__(self, player):
+        self.player = player
+
+    def initialize(self, side):
+        self.player.initialize(side)
+        self.side = side
+        self.name = self.player.name
+
+    def getMove(self, board):
+        code = self.player.getMove(board)
+        if code == KONANE_NO_MOVE:
+            return []
+        return unpackKonane(code)
+
+
+class PackedHarePlayer(harev2.Player):
+    """
+    Wraps a Hounds and Hare player whose getMove returns a packed move, or
+    HARE_NO_MOVE to concede, so that it can be used anywhere a list move
+    is expected.
+    """
+    def __init__(self, player):
+        self.player = player
+
+    def initialize(self, side):
+        self.player.initialize(side)
+        self.side = side
+        self.name = self.player.name
+
+    def getMove(self, board):
+        code = self.player.getMove(board)
+        if code == HARE_NO_MOVE:
+            return []
+        return unpackHare(code)
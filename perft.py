@@ -0,0 +1,111 @@
+### File: perft.py
+### Classes defined: Perft
+###
+### Counts the leaf nodes of the Konane game tree to a fixed depth.
+### The counts act as a correctness check for the move generator (any
+### change to generateMoves, including the special first and second
+### moves, must reproduce REFERENCE exactly) and the nodes per second
+### give a throughput number to go with it.
+
+import time
+
+from konane import Konane
+
+# Leaf counts from the starting position with black to move,
+# keyed by (board size, depth).
+REFERENCE = {
+    (4, 1): 4, (4, 2): 12, (4, 3): 16, (4, 4): 52, (4, 5): 120,
+    (4, 6): 376, (4, 7): 972, (4, 8): 2808,
+    (6, 1): 4, (6, 2): 12, (6, 3): 28, (6, 4): 156, (6, 5): 668,
+    (6, 6): 4192, (6, 7): 22676, (6, 8): 162288,
+    (8, 1): 4, (8, 2): 12, (8, 3): 28, (8, 4): 172, (8, 5): 892,
+    (8, 6): 7124, (8, 7): 52044,
+}
+
+
+class Perft:
+    """
+    Walks the Konane game tree for a given board size.  When hashed is
+    true, subtree counts are cached by position, side to move and
+    remaining depth, so transpositions are only counted once.
+    """
+    def __init__(self, size, hashed=False):
+        self.game = Konane(size)
+        self.hashed = hashed
+        self.cache = {}
+        self.nodes = 0
+
+    def key(self, board, player, depth):
+        return (''.join(''.join(row) for row in board), player, depth)
+
+    def perft(self, board, player, depth):
+        """
+        Returns the number of positions reached after exactly depth moves
+        from board with player to move.
+        """
+        self.nodes += 1
+        if depth == 0:
+            return 1
+        if self.hashed:
+            key = self.key(board, player, depth)
+            if key in self.cache:
+                return self.cache[key]
+        moves = self.game.generateMoves(board, player)
+        if depth == 1:
+            count = len(moves)
+        else:
+            opponent = self.game.opponent(player)
+            count = 0
+            for move in moves:
+                count += self.perft(self.game.nextBoard(board, player, move),
+                                    opponent, depth - 1)
+        if self.hashed:
+            self.cache[key] = count
+        return count
+
+    def divide(self, board, player, depth):
+        """
+        Returns a list of (move, count) pairs giving the perft count below
+        each root move.
+        """
+        opponent = self.game.opponent(player)
+        result = []
+        for move in self.game.generateMoves(board, player):
+            child = self.game.nextBoard(board, player, move)
+            result.append((move, self.perft(child, opponent, depth - 1)))
+        return result
+
+    def run(self, depth, player='B'):
+        """
+        Runs perft from the starting position and returns the count, the
+        number of nodes visited and the elapsed time in seconds.
+        """
+        self.game.reset()
+        self.cache = {}
+        self.nodes = 0
+        start = time.perf_counter()
+        count = self.perft(self.game.board, player, depth)
+        return count, self.nodes, time.perf_counter() - start
+
+
+def verify(hashed=False, maxDepth=None):
+    """
+    Checks the move generator against REFERENCE.  Returns a list of
+    (size, depth, expected, actual) for every mismatch.
+    """
+    failures = []
+    for (size, depth), expected in sorted(REFERENCE.items()):
+        if maxDepth is not None and depth > maxDepth:
+            continue
+        count = Perft(size, hashed).run(depth)[0]
+        if count != expected:
+            failures.append((size, depth, expected, count))
+    return failures
+
+
+if __name__ == "__main__":
+    print ("Mismatches:", verify())
+    for hashed in (False, True):
+        count, nodes, elapsed = Perft(8, hashed).run(7)
+        print ("8x8 depth 7", "hashed" if hashed else "plain", count,
+               int(count / elapsed), "leaves/s", nodes, "nodes")
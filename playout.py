@@ -0,0 +1,186 @@
+### File: playout.py
+### Classes defined: BatchPlayout, MonteCarloPlayer
+###
+### Plays thousands of random Konane games side by side.  All boards live
+### in one stacked NumPy array, the legal moves of every game are found
+### with whole-batch array operations, and each game then samples one of
+### its own legal moves from a seeded generator.  This is what
+### RandomPlayer does, one move per game per call, but for the whole
+### batch at once.
+
+import numpy as np
+
+from konane import *
+
+EMPTY = 0
+BLACK = 1
+WHITE = 2
+WALL = 3
+
+SYMBOLS = {'.': EMPTY, 'B': BLACK, 'W': WHITE}
+DIRECTIONS = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+
+class BatchPlayout:
+    """
+    Random playouts for n x n Konane.
+
+    A move is numbered by its direction, its number of jumps and its
+    starting square; the last n*n numbers are the opening moves, which
+    remove the piece on a square.
+    """
+    def __init__(self, size, seed=None):
+        self.size = size
+        self.maxJumps = (size - 1) // 2
+        self.rng = np.random.default_rng(seed)
+        self.jumpActions = 4 * self.maxJumps * size * size
+        first = np.zeros((size, size), dtype=bool)
+        for move in Konane(size).generateFirstMoves(None):
+            first[move[0], move[1]] = True
+        self.firstMoves = first
+
+    def encode(self, boards):
+        """
+        Returns a stacked int8 array for a list of Konane boards.
+        """
+        return np.array([[[SYMBOLS[cell] for cell in row] for row in board]
+                         for board in boards], dtype=np.int8)
+
+    def shifted(self, padded, dr, dc, distance):
+        """
+        Returns the view of padded giving, for every square, the contents
+        of the square distance steps away in direction (dr, dc).
+        """
+        n = self.size
+        top = n + dr * distance
+        left = n + dc * distance
+        return padded[:, top:top + n, left:left + n]
+
+    def legalMoves(self, boards, players):
+        """
+        Returns a boolean mask of shape (games, actions) with the legal
+        moves of each game for the colour given in players.
+        """
+        n = self.size
+        count = len(boards)
+        own = boards == players[:, None, None]
+        padded = np.pad(boards, ((0, 0), (n, n), (n, n)),
+                        constant_values=WALL)
+        jumps = np.zeros((count, 4, self.maxJumps, n, n), dtype=bool)
+        for d, (dr, dc) in enumerate(DIRECTIONS):
+            open_line = own
+            for k in range(self.maxJumps):
+                over = self.shifted(padded, dr, dc, 2*k + 1) \
+                    == (3 - players)[:, None, None]
+                land = self.shifted(padded, dr, dc, 2*k + 2) == EMPTY
+                open_line = open_line & over & land
+                jumps[:, d, k] = open_line
+        blanks = (boards == EMPTY).reshape(count, -1).sum(axis=1)
+        opening = np.zeros((count, n, n), dtype=bool)
+        firstTurn = blanks == 0
+        opening[firstTurn] = own[firstTurn] & self.firstMoves
+        secondTurn = blanks == 1
+        if secondTurn.any():
+            empty = boards == EMPTY
+            near = np.zeros_like(empty)
+            near[:, 1:, :] |= empty[:, :-1, :]
+            near[:, :-1, :] |= empty[:, 1:, :]
+            near[:, :, 1:] |= empty[:, :, :-1]
+            near[:, :, :-1] |= empty[:, :, 1:]
+            opening[secondTurn] = (own & near)[secondTurn]
+        jumps[blanks <= 1] = False
+        return np.concatenate([jumps.reshape(count, -1),
+                               opening.reshape(count, -1)], axis=1)
+
+    def applyMoves(self, boards, players, actions):
+        """
+        Plays one chosen action in each game, in place.
+        """
+        n = self.size
+        games = np.arange(len(boards))
+        isOpening = actions >= self.jumpActions
+        square = np.where(isOpening, actions - self.jumpActions,
+                          actions % (n * n))
+        rows = square // n
+        cols = square % n
+        boards[games, rows, cols] = EMPTY
+        rest = actions // (n * n)
+        jumpCount = np.where(isOpening, 0, rest % self.maxJumps + 1)
+        direction = np.where(isOpening, 0, rest // self.maxJumps)
+        dr = np.array([d[0] for d in DIRECTIONS])[direction]
+        dc = np.array([d[1] for d in DIRECTIONS])[direction]
+        for k in range(1, self.maxJumps + 1):
+            moving = jumpCount >= k
+            g = games[moving]
+            boards[g, rows[moving] + (2*k - 1) * dr[moving],
+                   cols[moving] + (2*k - 1) * dc[moving]] = EMPTY
+            boards[g, rows[moving] + 2*k * dr[moving],
+                   cols[moving] + 2*k * dc[moving]] = EMPTY
+        landing = ~isOpening
+        boards[games[landing],
+               rows[landing] + 2 * jumpCount[landing] * dr[landing],
+               cols[landing] + 2 * jumpCount[landing] * dc[landing]] \
+            = players[landing]
+
+    def play(self, boards, players):
+        """
+        Plays every game in the stacked boards to the end with random
+        moves.  players gives the colour to move in each game (BLACK or
+        WHITE).  Returns the winning colour of each game.
+        """
+        boards = boards.copy()
+        players = np.asarray(players, dtype=np.int8).copy()
+        winners = np.zeros(len(boards), dtype=np.int8)
+        active = np.arange(len(boards))
+        while len(active):
+            legal = self.legalMoves(boards[active], players[active])
+            stuck = ~legal.any(axis=1)
+            winners[active[stuck]] = 3 - players[active[stuck]]
+            active = active[~stuck]
+            legal = legal[~stuck]
+            if not len(active):
+                break
+            actions = np.argmax(self.rng.random(legal.shape) * legal, axis=1)
+            sub = boards[active]
+            self.applyMoves(sub, players[active], actions)
+            boards[active] = sub
+            players[active] = 3 - players[active]
+        return winners
+
+    def winRates(self, boards, player, playouts):
+        """
+        Plays playouts random games from each of the given Konane boards
+        with player ('B' or 'W') to move.  Returns a list of
+        (black wins, white wins) pairs, one per starting board.
+        """
+        start = np.repeat(self.encode(boards), playouts, axis=0)
+        colour = np.full(len(start), SYMBOLS[player], dtype=np.int8)
+        winners = self.play(start, colour).reshape(len(boards), playouts)
+        return [(int((w == BLACK).sum()), int((w == WHITE).sum()))
+                for w in winners]
+
+
+class MonteCarloPlayer(Konane, Player):
+    """
+    Scores every legal move by a batch of random playouts from the
+    position it leads to, and plays the move that wins most often.
+    """
+    def __init__(self, n, playouts=200, seed=None):
+        Konane.__init__(self, n)
+        self.playouts = playouts
+        self.engine = BatchPlayout(n, seed)
+
+    def initialize(self, side):
+        self.side = side
+        self.name = "MonteCarloPlayer"
+
+    def getMove(self, board):
+        moves = self.generateMoves(board, self.side)
+        if not moves:
+            return []
+        children = [self.nextBoard(board, self.side, move) for move in moves]
+        rates = self.engine.winRates(children, self.opponent(self.side),
+                                     self.playouts)
+        index = 0 if self.side == 'B' else 1
+        wins = [rate[index] for rate in rates]
+        return moves[wins.index(max(wins))]
@@ -0,0 +1,259 @@
+### File: pnsearch.py
+### Classes defined: ProofNumberSearch
+###
+### Depth-first proof-number search (df-pn) for Konane.  It proves or
+### disproves a win for the side to move, so it gives exact verdicts
+### where alpha-beta with a heuristic can only give an estimate.  Proof
+### and disproof numbers are kept in a table with a fixed number of
+### entries; when the table fills up the entries with the smallest
+### searched subtrees are thrown away first.
+###
+### Konane positions never repeat (every jump removes a piece), so the
+### search does not need any cycle handling.
+
+from konane import *
+from symmetry import KonaneSymmetry
+
+INF = 10**9
+
+# Rough size in bytes of one table entry (key string, list and dict slot),
+# used to turn a memory limit into a number of entries.
+ENTRY_BYTES = 300
+
+
+class ProofNumberSearch:
+    """
+    Solves Konane positions for an n x n board.
+
+    Internally a board is a string of n*n symbols in row order and a
+    move is a tuple (from, over, to) of square indexes, where over is
+    the list of jumped squares.  The table maps a position key to
+    [phi, delta, work]: phi is the proof number for the side to move
+    winning, delta the disproof number, and work the number of nodes
+    searched below the entry.
+    """
+    def __init__(self, size, maxEntries=None, memoryLimit=None,
+                 nodeLimit=None, epsilon=0.25):
+        self.size = size
+        self.game = Konane(size)
+        if maxEntries is None:
+            if memoryLimit is None:
+                memoryLimit = 256 * 2**20
+            maxEntries = memoryLimit // ENTRY_BYTES
+        self.maxEntries = maxEntries
+        self.nodeLimit = nodeLimit
+        self.epsilon = epsilon
+        self.table = {}
+        self.nodes = 0
+        self.collections = 0
+        n = size
+        self.lines = []
+        for square in range(n*n):
+            r, c = divmod(square, n)
+            lines = []
+            for dr, dc in ((-1, 0), (0, 1), (1, 0), (0, -1)):
+                line = []
+                rr = r + dr
+                cc = c + dc
+                while 0 <= rr < n and 0 <= cc < n:
+                    line.append(rr*n + cc)
+                    rr += dr
+                    cc += dc
+                if len(line) >= 2:
+                    lines.append(line)
+            self.lines.append(lines)
+        self.symmetry = KonaneSymmetry(size)
+
+    def encode(self, board):
+        return ''.join(''.join(row) for row in board)
+
+    def decode(self, position):
+        n = self.size
+        return [list(position[r*n:(r+1)*n]) for r in range(n)]
+
+    def moves(self, position, player):
+        """
+        Returns the moves for player in the same order as
+        Konane.generateMoves.
+        """
+        if position.count('.') <= 1:
+            n = self.size
+            return [(move[0]*n + move[1], (), move[0]*n + move[1])
+                    for move in self.game.generateMoves(self.decode(position),
+                                                        player)
+                    if position[move[0]*n + move[1]] == player]
+        opponent = 'W' if player == 'B' else 'B'
+        result = []
+        for square in range(len(position)):
+            if position[square] != player:
+                continue
+            for line in self.lines[square]:
+                i = 0
+                while i + 1 < len(line) and position[line[i]] == opponent \
+                      and position[line[i+1]] == '.':
+                    result.append((square, tuple(line[0:i+1:2]),
+                                   line[i+1]))
+                    i += 2
+        return result
+
+    def play(self, position, player, move):
+        cells = list(position)
+        start, over, end = move
+        cells[start] = '.'
+        for square in over:
+            cells[square] = '.'
+        if over:
+            cells[end] = player
+        return ''.join(cells)
+
+    def toMove(self, move):
+        """
+        Returns the Konane [r1, c1, r2, c2] form of an internal move.
+        """
+        n = self.size
+        return [move[0] // n, move[0] % n, move[2] // n, move[2] % n]
+
+    def key(self, position, player):
+        """
+        Returns the table key for a position: its canonical form under
+        KonaneSymmetry, followed by the side to move.
+        """
+        return self.symmetry.canonicalCells(position)[0] + player
+
+    def lookup(self, key):
+        entry = self.table.get(key)
+        if entry is None:
+            return 1, 1, 0
+        return entry
+
+    def expand(self, key, position, player):
+        """
+        Returns the entry for a child position, creating it if needed.
+        New entries start with a disproof number equal to the number of
+        moves, so that wide nodes look harder to refute, and positions
+        with no moves are settled straight away.
+        """
+        entry = self.table.get(key)
+        if entry is None:
+            count = len(self.moves(position, player))
+            if count == 0:
+                entry = [INF, 0, 1]
+            else:
+                entry = [1, count, 0]
+            self.store(key, *entry)
+        return entry
+
+    def store(self, key, phi, delta, work):
+        self.table[key] = [phi, delta, work]
+        if len(self.table) > self.maxEntries:
+            self.collect()
+
+    def collect(self):
+        """
+        Removes the half of the table with the least work, keeping proven
+        and disproven entries ahead of unsolved ones of equal work.
+        """
+        self.collections += 1
+        entries = sorted(self.table.items(),
+                         key=lambda item: (item[1][2],
+                                           item[1][0] == 0 or item[1][1] == 0))
+        for key, entry in entries[:len(entries) // 2]:
+            del self.table[key]
+
+    def mid(self, position, player, thphi, thdelta):
+        """
+        Searches position until its proof number reaches thphi or its
+        disproof number reaches thdelta.
+        """
+        self.nodes += 1
+        key = self.key(position, player)
+        opponent = 'W' if player == 'B' else 'B'
+        children = [self.play(position, player, move)
+                    for move in self.moves(position, player)]
+        if not children:
+            self.store(key, INF, 0, 1)
+            return
+        work = self.lookup(key)[2] + 1
+        keys = [self.key(child, opponent) for child in children]
+        while True:
+            delta = 0
+            best = None
+            bestDelta = INF
+            secondDelta = INF
+            for i, childKey in enumerate(keys):
+                cphi, cdelta, cwork = self.expand(childKey, children[i],
+                                                  opponent)
+                delta = min(INF, delta + cphi)
+                if cdelta < bestDelta:
+                    secondDelta = bestDelta
+                    bestDelta = cdelta
+                    best = i
+                elif cdelta < secondDelta:
+                    secondDelta = cdelta
+            phi = bestDelta
+            if phi >= thphi or delta >= thdelta or \
+               (self.nodeLimit is not None and self.nodes >= self.nodeLimit):
+                self.store(key, phi, delta, work)
+                return
+            cphi = self.lookup(keys[best])[0]
+            childThphi = thdelta + cphi - delta
+            childThdelta = min(thphi,
+                               int(secondDelta * (1 + self.epsilon)) + 1)
+            before = self.nodes
+            self.mid(children[best], opponent, childThphi, childThdelta)
+            work += self.nodes - before
+
+    def search(self, board, player):
+        """
+        Runs df-pn from a Konane board with player to move and returns the
+        root's [phi, delta, work] entry.
+        """
+        position = self.encode(board)
+        self.nodes = 0
+        self.mid(position, player, INF, INF)
+        return self.lookup(self.key(position, player))
+
+    def solve(self, board, player):
+        """
+        Returns True if player wins the board with player to move, False
+        if player loses, and None if the node limit ran out first.
+        """
+        phi, delta, work = self.search(board, player)
+        if phi == 0:
+            return True
+        if delta == 0:
+            return False
+        return None
+
+    def bestMove(self, board, player):
+        """
+        Returns a winning move for player if the position is proven, the
+        first legal move if it is disproven or unresolved, and [] if
+        player has no moves.
+        """
+        position = self.encode(board)
+        moves = self.moves(position, player)
+        if not moves:
+            return []
+        if self.solve(board, player):
+            opponent = 'W' if player == 'B' else 'B'
+            for move in moves:
+                child = self.key(self.play(position, player, move), opponent)
+                if self.lookup(child)[1] == 0:
+                    return self.toMove(move)
+        return self.toMove(moves[0])
+
+    def solveOpening(self, player='B'):
+        """
+        Solves the starting position of the board size.
+        """
+        self.game.reset()
+        return self.solve(self.game.board, player)
+
+
+if __name__ == "__main__":
+    for n in (4, 6):
+        solver = ProofNumberSearch(n)
+        result = solver.solveOpening()
+        print (f"{n}x{n}:", "first player wins" if result else
+               "second player wins", solver.nodes, "nodes")
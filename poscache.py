@@ -0,0 +1,140 @@
+### File: poscache.py
+### Classes defined: PositionCache
+###
+### A position store that outlives a single run.  Entries map a position
+### key to the value, depth, bound flag and packed best move found for
+### it, so a bot that meets the same opening or midgame position again,
+### in any run and any process, can use the earlier search.  The store
+### is an SQLite database in WAL mode, which lets many processes read
+### while one at a time writes.
+
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    flag INTEGER NOT NULL,
+    move INTEGER NOT NULL,
+    used REAL NOT NULL
+)
+"""
+
+INDEX = "CREATE INDEX IF NOT EXISTS positions_used ON positions (used)"
+
+# Keeps whichever of two entries was searched deeper.
+UPSERT = """
+INSERT INTO positions (key, value, depth, flag, move, used)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    value = excluded.value, depth = excluded.depth, flag = excluded.flag,
+    move = excluded.move, used = excluded.used
+WHERE excluded.depth >= positions.depth
+"""
+
+
+class PositionCache:
+    """
+    A persistent map from position keys to (depth, value, flag, move).
+
+    Lookups are answered from an in-process dictionary when possible and
+    go to the database otherwise.  Writes, and the last-used times of
+    entries that were read, are buffered and written in one transaction
+    by flush().  When the database holds more than maxEntries positions,
+    flush() evicts the least recently used ones.  The database is only
+    counted when an upper bound on its size, kept from the number of
+    entries written, passes maxEntries.  A cache may be used from
+    several threads, such as a pondering search and the main one; calls
+    are serialised by a lock.
+    """
+    def __init__(self, path, maxEntries=1000000, timeout=30.0):
+        self.path = path
+        self.maxEntries = maxEntries
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, timeout=timeout,
+                                          check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute(SCHEMA)
+            self.connection.execute(INDEX)
+        self.sizeBound = self.connection.execute(
+            "SELECT COUNT(*) FROM positions").fetchone()[0]
+        self.memory = {}
+        self.pending = {}
+        self.touched = set()
+
+    def get(self, key):
+        """
+        Returns (depth, value, flag, move) for key, or None.
+        """
+        with self.lock:
+            entry = self.pending.get(key)
+            if entry is None:
+                entry = self.memory.get(key)
+            if entry is None:
+                row = self.connection.execute(
+                    "SELECT depth, value, flag, move FROM positions "
+                    "WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                entry = row
+                self.memory[key] = entry
+            self.touched.add(key)
+            return entry
+
+    def put(self, key, depth, value, flag, move):
+        """
+        Records an entry, to be written at the next flush.  An entry from
+        a shallower search never replaces a deeper one.
+        """
+        with self.lock:
+            old = self.pending.get(key) or self.memory.get(key)
+            if old is not None and old[0] > depth:
+                return
+            self.pending[key] = (depth, value, flag, move)
+
+    def flush(self):
+        """
+        Writes buffered entries and last-used times, then evicts the least
+        recently used entries above maxEntries.
+        """
+        with self.lock:
+            now = time.time()
+            with self.connection:
+                self.connection.executemany(
+                    UPSERT, [(key, value, depth, flag, move, now)
+                             for key, (depth, value, flag, move)
+                             in self.pending.items()])
+                self.connection.executemany(
+                    "UPDATE positions SET used = ? WHERE key = ?",
+                    [(now, key) for key in self.touched
+                     if key not in self.pending])
+                self.sizeBound += len(self.pending)
+                if self.sizeBound > self.maxEntries:
+                    self.sizeBound = self.connection.execute(
+                        "SELECT COUNT(*) FROM positions").fetchone()[0]
+                if self.sizeBound > self.maxEntries:
+                    self.connection.execute(
+                        "DELETE FROM positions WHERE key IN (SELECT key FROM "
+                        "positions ORDER BY used LIMIT ?)",
+                        (self.sizeBound - self.maxEntries,))
+                    self.sizeBound = self.maxEntries
+                    self.memory.clear()
+            for key in self.pending:
+                self.memory.pop(key, None)
+            self.pending = {}
+            self.touched = set()
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.flush()
+            self.connection.close()
@@ -0,0 +1,294 @@
+### File: records.py
+### Classes defined: GameRecord, MoveRecorder, RecordWriter
+###
+### A compact binary record of finished games for both games, with a
+### streaming reader, an in-place replay and a parallel analysis pass.
+###
+### A record file starts with RECORD_MAGIC.  Each record is then:
+###   kind (1 byte: KONANE or HARE), size (1 byte: Konane board size or
+###   Hounds and Hare inner columns), result (1 byte, the winner's
+###   symbol), the start position (varint length + bytes), the number of
+###   moves (varint) and the packed moves (2 bytes each for Konane, 1 byte
+###   each for standard Hounds and Hare and 2 bytes each for larger
+###   Hounds and Hare boards).
+### A Konane start position stores 2 bits per square (0 empty, 1 black,
+### 2 white); a Hounds and Hare one stores the hare's square followed by
+### the square of each hound.
+
+import multiprocessing
+import struct
+
+import packed
+from search import HareRules, KonaneRules, SearchEngine
+from variants import VariantRules, variant
+
+RECORD_MAGIC = b'HHGR\x01'
+KONANE = 0
+HARE = 1
+
+SQUARE_CODES = {'.': 0, 'B': 1, 'W': 2}
+SQUARE_SYMBOLS = '.BW'
+
+
+def writeVarint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def readVarint(data, offset):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class GameRecord:
+    """
+    One finished game.  start is the board the game began from, in the
+    game's own format (a list of rows for Konane, a flat list for Hounds
+    and Hare), moves are list moves and result is the winner's symbol.
+    """
+    def __init__(self, kind, size, start, moves, result):
+        self.kind = kind
+        self.size = size
+        self.start = start
+        self.moves = moves
+        self.result = result
+
+    def firstPlayer(self):
+        return 'B' if self.kind == KONANE else 'O'
+
+    def wideMoves(self):
+        return self.kind == HARE and self.size != 3
+
+    def encode(self):
+        out = bytearray([self.kind, self.size, ord(self.result)])
+        position = bytearray()
+        if self.kind == KONANE:
+            cells = [cell for row in self.start for cell in row]
+            for i in range(0, len(cells), 4):
+                byte = 0
+                for j, cell in enumerate(cells[i:i + 4]):
+                    byte |= SQUARE_CODES[cell] << (2 * j)
+                position.append(byte)
+        else:
+            position.append(self.start.index('A'))
+            hounds = sorted((p for p in self.start if p.startswith('h')),
+                            key=lambda h: int(h[1:]))
+            for h in hounds:
+                position.append(self.start.index(h))
+        writeVarint(out, len(position))
+        out += position
+        writeVarint(out, len(self.moves))
+        for move in self.moves:
+            if self.kind == KONANE:
+                out += struct.pack('<H', packed.packKonane(move))
+            elif self.wideMoves():
+                out += bytes(move)
+            else:
+                out.append(packed.packHare(move))
+        return bytes(out)
+
+    @classmethod
+    def decode(cls, data, offset=0):
+        """
+        Returns (record, offset just past it).
+        """
+        kind, size, result = data[offset], data[offset + 1], data[offset + 2]
+        length, offset = readVarint(data, offset + 3)
+        position = data[offset:offset + length]
+        offset += length
+        if kind == KONANE:
+            cells = []
+            for byte in position:
+                for j in range(4):
+                    cells.append(SQUARE_SYMBOLS[(byte >> (2 * j)) & 3])
+            start = [cells[r*size:(r+1)*size] for r in range(size)]
+        else:
+            start = ['_'] * variant(size, len(position) - 1).size
+            start[position[0]] = 'A'
+            for i, square in enumerate(position[1:]):
+                start[square] = 'h' + str(i + 1)
+        count, offset = readVarint(data, offset)
+        moves = []
+        record = cls(kind, size, start, moves, chr(result))
+        for i in range(count):
+            if kind == KONANE:
+                moves.append(packed.unpackKonane(
+                    struct.unpack_from('<H', data, offset)[0]))
+                offset += 2
+            elif record.wideMoves():
+                moves.append([data[offset], data[offset + 1]])
+                offset += 2
+            else:
+                moves.append(packed.unpackHare(data[offset]))
+                offset += 1
+        return record, offset
+
+
+class MoveRecorder:
+    """
+    Wraps a player and appends every move it returns to a shared list.
+    A move that game rejects forfeits the game and is not recorded.
+    """
+    def __init__(self, player, moves, game):
+        self.player = player
+        self.moves = moves
+        self.game = game
+        self.name = player.name
+
+    def initialize(self, side):
+        self.player.initialize(side)
+        self.side = side
+        self.name = self.player.name
+
+    def getMove(self, board):
+        move = self.player.getMove(board)
+        if move != [] and \
+           list(move) in self.game.generateMoves(board, self.side):
+            self.moves.append(list(move))
+        return move
+
+
+def recordOneGame(game, p1, p2, show=False):
+    """
+    Plays game.playOneGame between p1 and p2 and returns its GameRecord.
+    game is a Konane, HoundsAndHare or VariantHoundsAndHare.
+    """
+    moves = []
+    result = game.playOneGame(MoveRecorder(p1, moves, game),
+                              MoveRecorder(p2, moves, game), show)
+    game.reset()
+    if hasattr(game, 'size'):
+        return GameRecord(KONANE, game.size, game.board, moves, result)
+    columns = getattr(game, 'variant', variant()).columns
+    return GameRecord(HARE, columns, list(game.board), moves, result)
+
+
+class RecordWriter:
+    """
+    Appends records to a record file.
+    """
+    def __init__(self, path):
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(RECORD_MAGIC)
+
+    def write(self, record):
+        self.file.write(record.encode())
+
+    def close(self):
+        self.file.close()
+
+
+def readRecords(path, chunkSize=1 << 20):
+    """
+    Yields the records of a file one at a time, reading it in chunks.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(RECORD_MAGIC)) != RECORD_MAGIC:
+            raise ValueError(path + " is not a game record file")
+        data = b''
+        offset = 0
+        while True:
+            chunk = f.read(chunkSize)
+            data = data[offset:] + chunk
+            offset = 0
+            while offset < len(data):
+                try:
+                    record, end = GameRecord.decode(data, offset)
+                except (IndexError, struct.error):
+                    break
+                if end > len(data):
+                    break
+                yield record
+                offset = end
+            if not chunk:
+                return
+
+
+def replay(record):
+    """
+    Yields (board, player) before every move and once more after the last.
+    The same flat board list is updated in place and yielded each time,
+    so copy it if it has to be kept.  Konane boards are flat lists of
+    size*size squares.
+    """
+    if record.kind == KONANE:
+        n = record.size
+        board = [cell for row in record.start for cell in row]
+        player = record.firstPlayer()
+        for r1, c1, r2, c2 in record.moves:
+            yield board, player
+            start = r1 * n + c1
+            board[start] = '.'
+            if (r1, c1) != (r2, c2):
+                dr = (r2 > r1) - (r2 < r1)
+                dc = (c2 > c1) - (c2 < c1)
+                r, c = r1, c1
+                while (r, c) != (r2, c2):
+                    board[(r + dr) * n + c + dc] = '.'
+                    r += 2 * dr
+                    c += 2 * dc
+                board[r2 * n + c2] = player
+            player = 'W' if player == 'B' else 'B'
+        yield board, player
+    else:
+        board = list(record.start)
+        player = record.firstPlayer()
+        for start, end in record.moves:
+            yield board, player
+            board[end] = board[start]
+            board[start] = '_'
+            player = 'A' if player == 'O' else 'O'
+        yield board, player
+
+
+def rulesFor(record):
+    if record.kind == KONANE:
+        return KonaneRules(record.size)
+    if record.size == 3 and len(record.start) == 11 and \
+       sum(1 for p in record.start if p.startswith('h')) == 3:
+        return HareRules()
+    return VariantRules(record.size,
+                        sum(1 for p in record.start if p.startswith('h')))
+
+
+def annotate(args):
+    """
+    Returns the engine's (value, best move) for the side to move at every
+    position of a record.
+    """
+    data, depth = args
+    record = GameRecord.decode(data)[0]
+    rules = rulesFor(record)
+    engine = SearchEngine(rules)
+    notes = []
+    n = record.size
+    for board, player in replay(record):
+        if record.kind == KONANE:
+            board = [board[r*n:(r+1)*n] for r in range(n)]
+        state = rules.state(board, player)
+        if not rules.moves(state) or rules.result(state) is not None:
+            notes.append((None, None))
+            continue
+        notes.append(engine.search(state, depth))
+    return notes
+
+
+def analyse(path, depth=3, workers=None, chunkSize=8):
+    """
+    Yields, in file order, the annotations of every record in a file,
+    computed in parallel by a process pool.
+    """
+    jobs = ((record.encode(), depth) for record in readRecords(path))
+    with multiprocessing.Pool(workers) as pool:
+        for notes in pool.imap(annotate, jobs, chunkSize):
+            yield notes
@@ -0,0 +1,849 @@
+### File: search.py
+### Classes defined: Rules, KonaneRules, IncrementalKonaneRules, HareRules,
+### SearchEngine, SharedTable, SharedSearchEngine, LazySMP, CachedSearch,
+### SearchPlayer, KonaneSearchPlayer
+###
+### A game-agnostic alpha-beta search.  Each game describes itself
+### through a Rules object, and the one SearchEngine works for any game
+### that does, so a search improvement made here applies to both
+### Konane and Hounds and Hare.
+###
+### A state is a tuple whose first two items are the board and the side
+### to move.  Boards inside states are never changed in place.
+
+import abc
+import asyncio
+import hashlib
+import multiprocessing
+import random
+import struct
+import threading
+import weakref
+from multiprocessing import shared_memory
+
+import harev2
+import konane
+import movelist
+import packed
+from endgame import EndgameSolver
+from mobility import MobilityEvaluator
+from poscache import PositionCache
+
+# Score of a won position, less the number of plies it takes to get there.
+WIN = 1000000
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Packed move stored in a shared table entry that has no best move.
+NO_MOVE = 0xFFFF
+
+# Search modes: plain alpha-beta, principal variation search with
+# aspiration windows, and MTD(f).
+MODES = ('alphabeta', 'pvs', 'mtdf')
+
+
+class SearchStopped(Exception):
+    """
+    Raised inside a search that was stopped from another thread.
+    """
+
+
+def stableHash(key):
+    """
+    Returns a 64-bit hash of a state key that is the same in every process
+    and every run, unlike hash().
+    """
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class Rules(metaclass = abc.ABCMeta):
+    """
+    The interface a game provides to the search engine.
+    """
+    def toMove(self, state):
+        """
+        Returns the side to move in state.
+        """
+        return state[1]
+
+    def name(self):
+        """
+        Returns a name for the game and board size, used to keep the
+        entries of different games apart in a shared PositionCache.
+        """
+        return type(self).__name__
+
+    @abc.abstractmethod
+    def state(self, board, player):
+        """
+        Returns the search state for a game board with player to move.
+        """
+
+    @abc.abstractmethod
+    def start(self):
+        """
+        Returns the state at the start of a game.
+        """
+
+    @abc.abstractmethod
+    def moves(self, state):
+        """
+        Returns the legal moves for the side to move.
+        """
+
+    @abc.abstractmethod
+    def play(self, state, move):
+        """
+        Returns the state after move, without changing state.
+        """
+
+    @abc.abstractmethod
+    def result(self, state):
+        """
+        Returns the winning side if the game is decided by something other
+        than the side to move running out of moves, and None otherwise.
+        """
+
+    @abc.abstractmethod
+    def evaluate(self, state):
+        """
+        Returns a heuristic score for the side to move.
+        """
+
+    @abc.abstractmethod
+    def key(self, state):
+        """
+        Returns a hashable key identifying the state.
+        """
+
+    @abc.abstractmethod
+    def packMove(self, move):
+        """
+        Returns move packed into an int below NO_MOVE.
+        """
+
+    @abc.abstractmethod
+    def unpackMove(self, code):
+        """
+        Returns the move for a packed int.
+        """
+
+
+class KonaneRules(Rules):
+    """
+    Konane on an n x n board.  A state is (board, player).  With an
+    endgame threshold, positions with at most that many pieces are
+    solved exactly by an EndgameSolver, and the search scores them as
+    won or lost instead of evaluating them.
+    """
+    def __init__(self, size, endgame=None):
+        self.game = konane.Konane(size)
+        self.mobility = MobilityEvaluator(size)
+        self.endgame = None
+        if endgame is not None:
+            self.endgame = EndgameSolver(size, endgame)
+
+    def name(self):
+        return 'konane' + str(self.game.size)
+
+    def state(self, board, player):
+        return (board, player)
+
+    def start(self):
+        self.game.reset()
+        return (self.game.board, 'B')
+
+    def moves(self, state):
+        return self.game.generateMoves(state[0], state[1])
+
+    def play(self, state, move):
+        board, player = state
+        return (self.game.nextBoard(board, player, move),
+                self.game.opponent(player))
+
+    def result(self, state):
+        if self.endgame is None:
+            return None
+        board, player = state[0], state[1]
+        won = self.endgame.probe(board, player)
+        if won is None:
+            return None
+        return player if won else self.game.opponent(player)
+
+    def evaluate(self, state):
+        """
+        Mobility: the side to move's moves less the opponent's.
+        """
+        return self.mobility.score(self.game, state[0], state[1])
+
+    def key(self, state):
+        return ''.join(''.join(row) for row in state[0]) + state[1]
+
+    def packMove(self, move):
+        return packed.packKonane(move)
+
+    def unpackMove(self, code):
+        return packed.unpackKonane(code)
+
+
+class IncrementalKonaneRules(KonaneRules):
+    """
+    KonaneRules whose states also carry both sides' moves, kept per line
+    by movelist: a state is (board, player, lines, counts), where counts
+    are the black and white move counts.  play() rescans only the lines
+    a move touched, so moves() and the mobility evaluation no longer
+    scan the whole board.
+    """
+    def state(self, board, player):
+        n = self.game.size
+        lines = movelist.scanBoard(board, n)
+        return (board, player, lines,
+                tuple(sum(len(moves) for moves in perLine)
+                      for perLine in lines))
+
+    def start(self):
+        self.game.reset()
+        return self.state(self.game.board, 'B')
+
+    def moves(self, state):
+        board, player, lines = state[:3]
+        if self.game.openingMove(board):
+            return self.game.generateMoves(board, player)
+        return [move for moves in lines[player == 'W'] for move in moves]
+
+    def play(self, state, move):
+        board, player, lines, counts = state
+        n = self.game.size
+        board = self.game.nextBoard(board, player, move)
+        lines = movelist.rescan(board, n, lines,
+                                movelist.touchedLines(n, move))
+        return (board, self.game.opponent(player), lines,
+                tuple(sum(len(moves) for moves in perLine)
+                      for perLine in lines))
+
+    def evaluate(self, state):
+        board, player, lines, counts = state
+        if self.game.openingMove(board):
+            return KonaneRules.evaluate(self, state)
+        mobility = counts[0] - counts[1]
+        return mobility if player == 'B' else -mobility
+
+
+class HareRules(Rules):
+    """
+    Hounds and Hare.  A state is (board, player, stall), where board is a
+    tuple, player is 'O' or 'A' and stall counts the hounds' consecutive
+    vertical moves.
+    """
+    def __init__(self):
+        self.game = harev2.HoundsAndHare()
+
+    def name(self):
+        return 'hare'
+
+    def state(self, board, player, stall=0):
+        return (tuple(board), player, stall)
+
+    def start(self):
+        self.game.reset()
+        return (tuple(self.game.board), 'O', 0)
+
+    def moves(self, state):
+        return self.game.generateMoves(state[0], state[1])
+
+    def play(self, state, move):
+        board, player, stall = state
+        cells = list(board)
+        cells[move[1]] = cells[move[0]]
+        cells[move[0]] = '_'
+        if player == 'O':
+            stall = stall + 1 if abs(move[0] - move[1]) == 1 else 0
+        return (tuple(cells), self.game.opponent(player), stall)
+
+    def result(self, state):
+        """
+        The hare wins by reaching square 0, by getting left of every hound
+        (hounds can never move left to catch it) or when the hounds stall
+        for 10 moves.
+        """
+        board, player, stall = state
+        if board[0] == 'A' or stall >= 10:
+            return 'A'
+        hare = self.game.getColumn(board, 'A')
+        if all(self.game.getColumn(board, h) > hare
+               for h in ('h1', 'h2', 'h3')):
+            return 'A'
+        return None
+
+    def evaluate(self, state):
+        """
+        Hare progress: its distance towards square 0 plus the number of
+        hounds it has got level with or past, scored for the side to move.
+        """
+        board = state[0]
+        hare = self.game.getColumn(board, 'A')
+        passed = sum(1 for h in ('h1', 'h2', 'h3')
+                     if self.game.getColumn(board, h) >= hare)
+        score = passed - hare
+        return score if state[1] == 'A' else -score
+
+    def key(self, state):
+        return state
+
+    def packMove(self, move):
+        return packed.packHare(move)
+
+    def unpackMove(self, code):
+        return packed.unpackHare(code)
+
+
+class SearchEngine:
+    """
+    Negamax alpha-beta search with a transposition table and iterative
+    deepening.  evaluate defaults to the rules' own evaluation and must
+    score a state for the side to move.
+
+    mode picks how each iteration is searched: 'alphabeta' with a full
+    window, 'pvs' with null windows after the first move at every node
+    and an aspiration window of +/- window around the previous
+    iteration's value, or 'mtdf' as a series of null-window searches
+    starting from the previous iteration's value.  The null windows are
+    one unit wide, so 'mtdf' needs far fewer passes when evaluations are
+    whole numbers.
+
+    Table entries keep their best move packed by the rules' packMove, so
+    a full table holds small ints rather than move lists.
+    """
+    def __init__(self, rules, evaluate=None, tableSize=2**20,
+                 mode='alphabeta', window=2):
+        if mode not in MODES:
+            raise ValueError("unknown search mode " + repr(mode))
+        self.rules = rules
+        self.evaluate = evaluate if evaluate is not None else rules.evaluate
+        self.tableSize = tableSize
+        self.mode = mode
+        self.window = window
+        self.table = {}
+        self.nodes = 0
+        self.stopped = False
+        self.rootMove = None
+
+    def stop(self):
+        """
+        Makes a search running in another thread raise SearchStopped.
+        """
+        self.stopped = True
+
+    def clear(self):
+        """
+        Empties the transposition table, for when the evaluation changes.
+        """
+        self.table.clear()
+
+    def probe(self, key):
+        """
+        Returns the table entry (depth, value, flag, move) for key, or None.
+        The move is packed by the rules' packMove, or NO_MOVE.
+        """
+        return self.table.get(key)
+
+    def store(self, key, depth, value, flag, move):
+        if len(self.table) >= self.tableSize:
+            self.table.clear()
+        self.table[key] = (depth, value, flag, move)
+
+    def orderMoves(self, moves, ttMove):
+        """
+        Puts the table's best move, a packed move or NO_MOVE, first.
+        """
+        if ttMove != NO_MOVE:
+            ttMove = self.rules.unpackMove(ttMove)
+            if ttMove in moves:
+                moves.remove(ttMove)
+                moves.insert(0, ttMove)
+        return moves
+
+    def negamax(self, state, depth, alpha, beta, ply):
+        """
+        Returns the value of state for the side to move, searched depth
+        plies deep.
+        """
+        self.nodes += 1
+        if self.stopped:
+            raise SearchStopped
+        rules = self.rules
+        winner = rules.result(state)
+        if winner is not None:
+            return WIN - ply if winner == rules.toMove(state) else ply - WIN
+        key = rules.key(state)
+        entry = self.probe(key)
+        ttMove = NO_MOVE
+        if entry is not None:
+            ttDepth, value, flag, ttMove = entry
+            if ttDepth >= depth and (flag == EXACT or
+                                     (flag == LOWER and value >= beta) or
+                                     (flag == UPPER and value <= alpha)):
+                if ply == 0:
+                    self.rootMove = None if ttMove == NO_MOVE \
+                        else rules.unpackMove(ttMove)
+                return value
+        if depth == 0:
+            return self.evaluate(state)
+        moves = rules.moves(state)
+        if not moves:
+            return ply - WIN
+        moves = self.orderMoves(moves, ttMove)
+        originalAlpha = alpha
+        best = -WIN - 1
+        bestMove = None
+        nullWindow = self.mode != 'alphabeta'
+        for i, move in enumerate(moves):
+            child = rules.play(state, move)
+            if i == 0 or not nullWindow:
+                value = -self.negamax(child, depth - 1, -beta, -alpha,
+                                      ply + 1)
+            else:
+                value = -self.negamax(child, depth - 1, -alpha - 1, -alpha,
+                                      ply + 1)
+                if alpha < value < beta and beta - alpha > 1:
+                    value = -self.negamax(child, depth - 1, -beta, -alpha,
+                                          ply + 1)
+            if value > best:
+                best = value
+                bestMove = move
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+        if best <= originalAlpha:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.store(key, depth, best, flag,
+                   NO_MOVE if bestMove is None else rules.packMove(bestMove))
+        if ply == 0:
+            self.rootMove = bestMove
+        return best
+
+    def aspiration(self, state, depth, guess):
+        """
+        Searches the root in a window around guess, opening the side that
+        fails until the value falls inside.
+        """
+        alpha = max(guess - self.window, -WIN - 1)
+        beta = min(guess + self.window, WIN + 1)
+        while True:
+            value = self.negamax(state, depth, alpha, beta, 0)
+            if value <= alpha and alpha > -WIN - 1:
+                alpha = -WIN - 1
+            elif value >= beta and beta < WIN + 1:
+                beta = WIN + 1
+            else:
+                return value
+
+    def mtdf(self, state, depth, guess):
+        """
+        MTD(f): closes in on the root value with null-window searches,
+        starting from guess.  Returns (value, best move).
+        """
+        lower = -WIN - 1
+        upper = WIN + 1
+        value = guess
+        move = None
+        while lower < upper:
+            beta = value + 1 if value == lower else value
+            value = self.negamax(state, depth, beta - 1, beta, 0)
+            if value < beta:
+                upper = value
+            else:
+                lower = value
+                move = self.rootMove
+        return value, move
+
+    def search(self, state, depth):
+        """
+        Searches state to the given depth with iterative deepening.
+        Returns (value, best move); the move is None if there is none.
+        """
+        self.nodes = 0
+        value = None
+        move = None
+        for d in range(1, depth + 1):
+            self.rootMove = None
+            if self.mode == 'mtdf':
+                value, move = self.mtdf(state, d,
+                                        0 if value is None else value)
+            else:
+                if self.mode == 'pvs' and value is not None:
+                    value = self.aspiration(state, d, value)
+                else:
+                    value = self.negamax(state, d, -WIN - 1, WIN + 1, 0)
+                move = self.rootMove
+            if abs(value) >= WIN - d:
+                break
+        return value, move
+
+
+class SharedTable:
+    """
+    A transposition table in shared memory that several processes read
+    and write without locks.
+
+    Each entry is two unsigned 64-bit words: the position's 64-bit hash
+    XORed with the data word, then the data word itself.  A reader only
+    trusts an entry whose first word XORed with its second gives back
+    the hash it is looking for, so an entry torn by two processes
+    writing at once is simply treated as a miss.  The data word holds
+    the value (offset to be unsigned) in its top 32 bits, then the
+    depth, the flag and the packed best move.
+    """
+    ENTRY = struct.Struct('<QQ')
+
+    def __init__(self, entries=2**20, name=None):
+        self.entries = entries
+        if name is None:
+            self.memory = shared_memory.SharedMemory(
+                create=True, size=entries * self.ENTRY.size)
+            self.memory.buf[:entries * self.ENTRY.size] = \
+                bytes(entries * self.ENTRY.size)
+            self.finalizer = weakref.finalize(self, SharedTable.release,
+                                              self.memory, True)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+            self.finalizer = weakref.finalize(self, SharedTable.release,
+                                              self.memory, False)
+        self.name = self.memory.name
+
+    @staticmethod
+    def release(memory, owner):
+        memory.close()
+        if owner:
+            memory.unlink()
+
+    def close(self):
+        """
+        Detaches from the shared memory, freeing it if this table made it.
+        """
+        self.finalizer()
+
+    def clear(self):
+        size = self.entries * self.ENTRY.size
+        self.memory.buf[:size] = bytes(size)
+
+    def probe(self, key):
+        h = stableHash(key)
+        check, data = self.ENTRY.unpack_from(self.memory.buf,
+                                             (h % self.entries) *
+                                             self.ENTRY.size)
+        if check ^ data != h or data == 0:
+            return None
+        value = (data >> 32) - 2**31
+        depth = (data >> 24) & 0xFF
+        flag = (data >> 16) & 0xFF
+        return (depth, value, flag, data & 0xFFFF)
+
+    def store(self, key, depth, value, flag, move):
+        h = stableHash(key)
+        offset = (h % self.entries) * self.ENTRY.size
+        check, data = self.ENTRY.unpack_from(self.memory.buf, offset)
+        if check ^ data == h and ((data >> 24) & 0xFF) > depth:
+            return
+        data = ((value + 2**31) << 32) | (min(depth, 255) << 24) | \
+            (flag << 16) | move
+        self.ENTRY.pack_into(self.memory.buf, offset, h ^ data, data)
+
+
+class SharedSearchEngine(SearchEngine):
+    """
+    A SearchEngine whose transposition table is a SharedTable.  With a
+    seed, moves after the table's best move are searched in a shuffled
+    order, so that helpers explore different parts of the tree.
+    """
+    def __init__(self, rules, table, evaluate=None, seed=None,
+                 mode='alphabeta', window=2):
+        SearchEngine.__init__(self, rules, evaluate, mode=mode,
+                              window=window)
+        self.shared = table
+        self.random = random.Random(seed) if seed is not None else None
+
+    def clear(self):
+        self.shared.clear()
+
+    def probe(self, key):
+        return self.shared.probe(key)
+
+    def store(self, key, depth, value, flag, move):
+        self.shared.store(key, depth, value, flag, move)
+
+    def orderMoves(self, moves, ttMove):
+        if self.random is not None:
+            self.random.shuffle(moves)
+        return SearchEngine.orderMoves(self, moves, ttMove)
+
+
+class LazySMP:
+    """
+    Lazy SMP: helper processes search the same root as the main search,
+    half of them one ply deeper and all with their own move order, and
+    they share what they find only through the SharedTable.  The main
+    search's answer is used as soon as it finishes, and the helpers are
+    then stopped.  Helpers are forked, so the rules and evaluation do
+    not need to be picklable.
+    """
+    def __init__(self, rules, evaluate=None, workers=None, entries=2**20,
+                 mode='alphabeta', window=2):
+        self.rules = rules
+        self.workers = workers or multiprocessing.cpu_count()
+        self.table = SharedTable(entries)
+        self.engine = SharedSearchEngine(rules, self.table, evaluate,
+                                         mode=mode, window=window)
+        self.evaluate = self.engine.evaluate
+        self.context = multiprocessing.get_context('fork')
+        self.nodes = 0
+
+    def helper(self, state, depth, seed):
+        engine = SharedSearchEngine(self.rules, self.table,
+                                    self.engine.evaluate, seed,
+                                    self.engine.mode, self.engine.window)
+        engine.search(state, depth)
+
+    def search(self, state, depth):
+        """
+        Searches state to the given depth.  Returns (value, best move).
+        """
+        helpers = []
+        for i in range(1, self.workers):
+            process = self.context.Process(target=self.helper,
+                                           args=(state, depth + i % 2, i),
+                                           daemon=True)
+            process.start()
+            helpers.append(process)
+        try:
+            result = self.engine.search(state, depth)
+        finally:
+            for process in helpers:
+                process.terminate()
+            for process in helpers:
+                process.join()
+        self.nodes = self.engine.nodes
+        return result
+
+    def clear(self):
+        self.engine.clear()
+
+    def probe(self, key):
+        return self.engine.probe(key)
+
+    def stop(self):
+        self.engine.stop()
+
+    @property
+    def stopped(self):
+        return self.engine.stopped
+
+    @stopped.setter
+    def stopped(self, value):
+        self.engine.stopped = value
+
+    def close(self):
+        self.table.close()
+
+
+class CachedSearch:
+    """
+    Wraps a search with a PositionCache.  A root that the cache already
+    holds an exact result for, searched at least as deep, is answered
+    without searching.  After a search, the root's result is written to
+    the cache.  Interior table entries are not: they are always
+    shallower than the root search that made them, so a later root
+    search of the same depth could never use them.
+
+    Cache keys start with the game's name and a namespace for the
+    evaluation, so that searches with different evaluations never read
+    each other's entries.  namespace is a string, or a function
+    returning one for evaluations that change (such as a player's side);
+    by default it is the name of the evaluation function.
+    """
+    def __init__(self, engine, cache, namespace=None):
+        self.engine = engine
+        self.rules = engine.rules
+        self.cache = cache
+        self.namespace = namespace
+        self.nodes = 0
+
+    def prefix(self):
+        namespace = self.namespace
+        if callable(namespace):
+            namespace = namespace()
+        if namespace is None:
+            evaluate = self.engine.evaluate
+            namespace = getattr(evaluate, '__qualname__', repr(evaluate))
+        return self.rules.name() + '/' + namespace + '/'
+
+    def search(self, state, depth):
+        prefix = self.prefix()
+        key = prefix + repr(self.rules.key(state))
+        entry = self.cache.get(key)
+        if entry is not None and entry[0] >= depth and entry[2] == EXACT \
+           and entry[3] != NO_MOVE:
+            self.nodes = 0
+            return entry[1], self.rules.unpackMove(entry[3])
+        value, move = self.engine.search(state, depth)
+        self.nodes = self.engine.nodes
+        if move is not None:
+            self.cache.put(key, depth, value, EXACT,
+                           self.rules.packMove(move))
+        self.cache.flush()
+        return value, move
+
+    def clear(self):
+        self.engine.clear()
+
+    def probe(self, key):
+        return self.engine.probe(key)
+
+    def stop(self):
+        self.engine.stop()
+
+    @property
+    def stopped(self):
+        return self.engine.stopped
+
+    @stopped.setter
+    def stopped(self, value):
+        self.engine.stopped = value
+
+
+def makeEngine(rules, evaluate=None, workers=1, cache=None,
+               mode='alphabeta', window=2, namespace=None):
+    """
+    Returns a SearchEngine, or a LazySMP search when workers is above 1.
+    cache, a PositionCache or the path of one, adds a persistent cache in
+    front of the search, with namespace as in CachedSearch.  mode and
+    window are passed to the SearchEngine.
+    """
+    if workers > 1:
+        engine = LazySMP(rules, evaluate, workers, mode=mode, window=window)
+    else:
+        engine = SearchEngine(rules, evaluate, mode=mode, window=window)
+    if cache is not None:
+        if isinstance(cache, str):
+            cache = PositionCache(cache)
+        engine = CachedSearch(engine, cache, namespace=namespace)
+    return engine
+
+
+class SearchPlayer:
+    """
+    getMove for players that search with a SearchEngine.  Subclasses set
+    self.rules, self.engine and self.limit (the search depth).
+
+    When self.ponder is true, the player keeps searching after it has
+    moved: it guesses the opponent's reply from the table and searches
+    the position that reply would lead to in a background thread.  If
+    the opponent plays the guessed move, that search is the answer to
+    the next getMove; otherwise it is stopped, and only the entries it
+    left in the table are kept.
+    """
+    ponder = False
+    ponderThread = None
+
+    def getMove(self, board):
+        state = self.rules.state(board, self.side)
+        moves = self.rules.moves(state)
+        if not moves:
+            self.stopPondering()
+            return []
+        result = self.stopPondering(state)
+        if result is None:
+            result = self.engine.search(state, self.limit)
+        move = result[1] if result[1] is not None else moves[0]
+        if self.ponder:
+            self.startPondering(state, move)
+        return move
+
+    async def getMoveAsync(self, board):
+        """
+        getMove for an asyncio server: the search runs in the default
+        executor, so the event loop keeps serving while this player
+        thinks or ponders.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.getMove, board)
+
+    def startPondering(self, state, move):
+        after = self.rules.play(state, move)
+        replies = self.rules.moves(after)
+        if not replies or self.rules.result(after) is not None:
+            return
+        entry = self.engine.probe(self.rules.key(after))
+        reply = replies[0]
+        if entry is not None and entry[3] != NO_MOVE:
+            best = self.rules.unpackMove(entry[3])
+            if best in replies:
+                reply = best
+        predicted = self.rules.play(after, reply)
+        predicted = self.rules.state(predicted[0], predicted[1])
+        self.ponderKey = self.rules.key(predicted)
+        self.ponderResult = None
+        self.engine.stopped = False
+        self.ponderThread = threading.Thread(target=self.ponderSearch,
+                                             args=(predicted,), daemon=True)
+        self.ponderThread.start()
+
+    def ponderSearch(self, state):
+        try:
+            self.ponderResult = self.engine.search(state, self.limit)
+        except SearchStopped:
+            pass
+
+    def stopPondering(self, state=None):
+        """
+        Ends any ponder search.  Returns its (value, move) if state is the
+        position that was pondered, waiting for the search to finish if
+        need be, and None otherwise.
+        """
+        if self.ponderThread is None:
+            return None
+        hit = state is not None and self.rules.key(state) == self.ponderKey
+        if not hit:
+            self.engine.stop()
+        self.ponderThread.join()
+        self.ponderThread = None
+        self.engine.stopped = False
+        return self.ponderResult if hit else None
+
+
+class KonaneSearchPlayer(SearchPlayer, konane.Player):
+    """
+    Alpha-beta search for Konane using the mobility evaluation, or with
+    weights a weighted sum of mobility.FEATURES.  endgame is the piece
+    count at or below which positions are solved exactly (see
+    KonaneRules).
+    """
+    def __init__(self, n, depthLimit, workers=1, cache=None, ponder=False,
+                 mode='alphabeta', incremental=False, weights=None,
+                 endgame=None):
+        self.rules = IncrementalKonaneRules(n, endgame) if incremental \
+            else KonaneRules(n, endgame)
+        evaluate = None
+        namespace = None
+        if weights is not None:
+            evaluator = MobilityEvaluator(n, weights)
+            game = self.rules.game
+            evaluate = lambda state: evaluator.score(game, state[0], state[1])
+            namespace = 'mobility' + repr(tuple(weights))
+        self.engine = makeEngine(self.rules, evaluate, workers, cache, mode,
+                                 namespace=namespace)
+        self.limit = depthLimit
+        self.ponder = ponder
+
+    def initialize(self, side):
+        self.stopPondering()
+        self.side = side
+        self.name = "KonaneSearchPlayer"
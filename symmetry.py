@@ -0,0 +1,198 @@
+### File: symmetry.py
+### Classes defined: KonaneSymmetry, HareSymmetry
+###
+### Canonical forms of positions for both games, so that positions that
+### are the same up to a symmetry can share one cache or dataset entry.
+### Each class precomputes its symmetries as permutation tables: a
+### transformed board is [board[p] for p in perm].  canonical() picks the
+### smallest transformed board and also returns the index of the
+### transform used, which maps moves between the original board and the
+### canonical one.
+###
+### After the opening, Konane has all eight rotations and reflections of
+### the square, because only the starting position depends on the colour
+### of a square.  During the opening removals only the transforms that
+### keep the set of first-move squares in place apply: four on even
+### boards and two (identity and transpose) on odd ones.  Hounds and
+### Hare is mirrored top to bottom (1<->3, 4<->6, 7<->9 on the standard
+### board) and its hounds are interchangeable, so canonical boards name
+### the hounds h1, h2, ... in square order.
+###
+### The Hounds and Hare stall rule is not symmetric: a hound move between
+### consecutive squares counts as a stall, so 0->1 and 9->10 count while
+### their mirror images 0->3 and 7->10 do not.  The mirror is therefore
+### only used once no hound can make either move again, that is when no
+### hound is on the left tip (hounds never move left, so none can come
+### back to it) and a hound holds the right tip (which it never leaves).
+
+import operator
+
+import numpy as np
+
+from konane import Konane
+from variants import variant
+
+CODES = {'.': 0, 'B': 1, 'W': 2}
+SYMBOLS = bytes.maketrans(b'\x00\x01\x02', b'.BW')
+
+
+class KonaneSymmetry:
+    """
+    The symmetries of n x n Konane.  Canonical keys have the form of
+    KonaneRules keys: the board's squares in row order followed by the
+    side to move.
+    """
+    def __init__(self, size):
+        self.size = size
+        n = size
+        squares = [[r*n + c for c in range(n)] for r in range(n)]
+        self.perms = []
+        for i in range(4):
+            squares = [list(row) for row in zip(*squares[::-1])]
+            for grid in (squares, [row[::-1] for row in squares]):
+                self.perms.append(tuple(s for row in grid for s in row))
+        # forward[t][s] is where square s ends up under transform t.
+        self.forward = []
+        for perm in self.perms:
+            forward = [0] * (n*n)
+            for i, s in enumerate(perm):
+                forward[s] = i
+            self.forward.append(tuple(forward))
+        self.getters = [operator.itemgetter(*perm) for perm in self.perms]
+        first = {r*n + c for r, c, r2, c2 in
+                 Konane(n).generateFirstMoves(None)}
+        self.openingTransforms = tuple(
+            t for t, forward in enumerate(self.forward)
+            if {forward[s] for s in first} == first)
+        self.allTransforms = tuple(range(len(self.perms)))
+        self.permArray = np.array(self.perms, dtype=np.intp)
+
+    def transforms(self, blanks):
+        """
+        Returns the transforms that apply to a board with blanks empty
+        squares.
+        """
+        return self.openingTransforms if blanks <= 1 else self.allTransforms
+
+    def canonical(self, board, player):
+        """
+        Returns (canonical key, transform) for board with player to move.
+        """
+        cells, best = self.canonicalCells(''.join(''.join(row)
+                                                  for row in board))
+        return cells + player, best
+
+    def canonicalCells(self, cells):
+        """
+        Returns (canonical cells, transform) for a board given as a string
+        of its squares in row order.
+        """
+        best = min(self.transforms(cells.count('.')),
+                   key=lambda t: self.getters[t](cells))
+        return ''.join(self.getters[best](cells)), best
+
+    def canonicalBatch(self, states):
+        """
+        Returns [(canonical key, transform)] for a list of states whose
+        first two items are a board and the side to move, all worked out
+        together with array operations.
+        """
+        if not states:
+            return []
+        n = self.size
+        codes = np.array([[CODES[cell] for row in state[0] for cell in row]
+                          for state in states], dtype=np.uint8)
+        candidates = codes[:, self.permArray]
+        opening = np.zeros(len(self.perms), dtype=bool)
+        opening[list(self.openingTransforms)] = True
+        alive = np.where((codes == 0).sum(axis=1, keepdims=True) <= 1,
+                         opening, True)
+        for j in range(n*n):
+            if (alive.sum(axis=1) == 1).all():
+                break
+            column = np.where(alive, candidates[:, :, j], 255)
+            alive &= column == column.min(axis=1, keepdims=True)
+        best = alive.argmax(axis=1)
+        return [(candidates[i, t].tobytes().translate(SYMBOLS).decode() +
+                 state[1], int(t))
+                for i, (state, t) in enumerate(zip(states, best))]
+
+    def mapSquare(self, r, c, t):
+        r, c = divmod(self.forward[t][r*self.size + c], self.size)
+        return r, c
+
+    def toCanonical(self, move, t):
+        """
+        Returns a move on the original board as a move on the canonical one.
+        """
+        return list(self.mapSquare(move[0], move[1], t) +
+                    self.mapSquare(move[2], move[3], t))
+
+    def fromCanonical(self, move, t):
+        """
+        Returns a move on the canonical board as a move on the original one.
+        """
+        n = self.size
+        perm = self.perms[t]
+        r1, c1 = divmod(perm[move[0]*n + move[1]], n)
+        r2, c2 = divmod(perm[move[2]*n + move[3]], n)
+        return [r1, c1, r2, c2]
+
+
+class HareSymmetry:
+    """
+    The symmetries of Hounds and Hare on a standard or generated board.
+    Canonical keys have the form of HareRules states, (board tuple,
+    player, stall), so they are valid positions as well as keys.
+    """
+    def __init__(self, columns=3, hounds=3):
+        self.variant = variant(columns, hounds)
+        v = self.variant
+        mirror = tuple(v.index[(2 - r, c)] for r, c in v.coordinates)
+        self.perms = (tuple(range(v.size)), mirror)
+        # Both transforms are their own inverse.
+        self.forward = self.perms
+
+    def mirrorApplies(self, board):
+        """
+        Returns true if no hound can make a move whose stall count differs
+        from its mirror image's.
+        """
+        return board[0][0] != 'h' and board[self.variant.size - 1][0] == 'h'
+
+    def canonical(self, board, player, stall=0):
+        """
+        Returns (canonical key, transform) for board with player to move.
+        """
+        best = None
+        bestTransform = 0
+        perms = self.perms if self.mirrorApplies(board) else self.perms[:1]
+        for t, perm in enumerate(perms):
+            cells = [board[p] for p in perm]
+            hounds = [i for i, cell in enumerate(cells) if cell[0] == 'h']
+            for name, i in zip(self.variant.houndNames, hounds):
+                cells[i] = name
+            cells = tuple(cells)
+            if best is None or cells < best:
+                best = cells
+                bestTransform = t
+        return (best, player, stall), bestTransform
+
+    def canonicalBatch(self, states):
+        """
+        Returns [(canonical key, transform)] for a list of HareRules
+        states.
+        """
+        return [self.canonical(*state) for state in states]
+
+    def toCanonical(self, move, t):
+        """
+        Returns a move on the original board as a move on the canonical one.
+        """
+        return [self.forward[t][move[0]], self.forward[t][move[1]]]
+
+    def fromCanonical(self, move, t):
+        """
+        Returns a move on the canonical board as a move on the original one.
+        """
+        return [self.perms[t][move[0]], self.perms[t][move[1]]]
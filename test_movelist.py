@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+import konane
+from movelist import MoveList
+from search import IncrementalKonaneRules, KonaneRules
+
+
+def assertMovesMatch(game, moveList):
+    for side in ('B', 'W'):
+        expected = sorted(game.generateMoves(moveList.board, side))
+        assert sorted(moveList.moves(side)) == expected
+        assert moveList.count(side) == len(expected)
+
+
+@pytest.mark.parametrize('size', [5, 6, 8])
+def test_play_and_undo_match_generate_moves(size):
+    rng = random.Random(size)
+    game = konane.Konane(size)
+    for trial in range(3):
+        moveList = MoveList(game, game.board)
+        boards = []
+        player = 'B'
+        while True:
+            assertMovesMatch(game, moveList)
+            moves = moveList.moves(player)
+            if not moves:
+                break
+            boards.append([list(row) for row in moveList.board])
+            moveList.play(player, rng.choice(moves))
+            player = game.opponent(player)
+        while boards:
+            moveList.undo()
+            assert moveList.board == boards.pop()
+            assertMovesMatch(game, moveList)
+
+
+@pytest.mark.parametrize('size', [5, 6, 8])
+def test_incremental_rules_match_konane_rules(size):
+    rng = random.Random(size)
+    plain = KonaneRules(size)
+    incremental = IncrementalKonaneRules(size)
+    for trial in range(3):
+        state = plain.start()
+        fast = incremental.start()
+        while True:
+            moves = plain.moves(state)
+            assert sorted(incremental.moves(fast)) == sorted(moves)
+            assert incremental.evaluate(fast) == plain.evaluate(state)
+            if not moves:
+                break
+            move = rng.choice(moves)
+            state = plain.play(state, move)
+            fast = incremental.play(fast, move)
+            assert fast[0] == state[0]
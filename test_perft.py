@@ -0,0 +1,16 @@
+import pytest
+
+from perft import REFERENCE, Perft, verify
+
+SHALLOW = sorted(key for key in REFERENCE if key[1] <= 5)
+
+
+@pytest.mark.parametrize('hashed', [False, True])
+@pytest.mark.parametrize('size,depth', SHALLOW)
+def test_reference_counts(size, depth, hashed):
+    assert Perft(size, hashed).run(depth)[0] == REFERENCE[(size, depth)]
+
+
+def test_verify_reports_no_mismatches():
+    assert verify(maxDepth=4) == []
+    assert verify(hashed=True, maxDepth=4) == []
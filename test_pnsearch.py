@@ -0,0 +1,14 @@
+from pnsearch import INF, ProofNumberSearch
+
+
+def test_collect_keeps_solved_entries():
+    search = ProofNumberSearch(4, maxEntries=4)
+    search.store('proven', 0, INF, 1)
+    search.store('disproven', INF, 0, 1)
+    search.store('open1', 2, 3, 1)
+    search.store('open2', 3, 2, 1)
+    search.store('open3', 1, 1, 1)
+    assert search.collections == 1
+    assert 'proven' in search.table
+    assert 'disproven' in search.table
+    assert 'open1' not in search.table
@@ -0,0 +1,40 @@
+import harev2
+import konane
+from records import MoveRecorder
+
+
+class FixedPlayer:
+    name = 'FixedPlayer'
+
+    def __init__(self, move):
+        self.move = move
+
+    def initialize(self, side):
+        self.side = side
+
+    def getMove(self, board):
+        return self.move
+
+
+def recorded(game, side, move):
+    moves = []
+    recorder = MoveRecorder(FixedPlayer(move), moves, game)
+    recorder.initialize(side)
+    assert recorder.getMove(game.board) == move
+    return moves
+
+
+def test_konane_recorder_skips_invalid_moves():
+    game = konane.Konane(6)
+    assert recorded(game, 'B', [0, 0, 0, 0]) == [[0, 0, 0, 0]]
+    assert recorded(game, 'B', [0, 1, 0, 1]) == []
+    assert recorded(game, 'B', [2, 2, 2, 4]) == []
+
+
+def test_hare_recorder_skips_invalid_moves(capsys):
+    game = harev2.HoundsAndHare()
+    assert recorded(game, 'A', [10, 7]) == [[10, 7]]
+    assert recorded(game, 'A', [10, 2]) == []
+    assert recorded(game, 'O', [0, 2]) == [[0, 2]]
+    assert recorded(game, 'O', [3, 10]) == []
+    assert capsys.readouterr().out == ''
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+
+import pytest
+
+import konane
+from search import KonaneSearchPlayer
+
+
+def startBoard(n):
+    game = konane.Konane(n)
+    board = game.nextBoard(game.board, 'B', [0, 0, 0, 0])
+    return game, game.nextBoard(board, 'W', [0, 1, 0, 1])
+
+
+def test_ponder_with_cache(tmp_path, monkeypatch):
+    errors = []
+    monkeypatch.setattr(threading, 'excepthook', errors.append)
+    player = KonaneSearchPlayer(6, 2, cache=str(tmp_path / 'cache.db'),
+                                ponder=True)
+    player.initialize('B')
+    game, board = startBoard(6)
+    move = player.getMove(board)
+    assert move in game.generateMoves(board, 'B')
+    player.ponderThread.join()
+    assert player.ponderResult is not None
+    player.stopPondering()
+    assert errors == []
+
+
+def test_async_with_cache(tmp_path):
+    player = KonaneSearchPlayer(6, 2, cache=str(tmp_path / 'cache.db'))
+    player.initialize('B')
+    game, board = startBoard(6)
+    move = asyncio.run(player.getMoveAsync(board))
+    assert move in game.generateMoves(board, 'B')
+
+
+def test_cache_keeps_evaluations_apart(tmp_path):
+    from minimax import MinimaxPlayer
+    from poscache import PositionCache
+    cache = PositionCache(str(tmp_path / 'cache.db'))
+    hounds = MinimaxPlayer(3, cache=cache)
+    hounds.initialize('O')
+    hare = MinimaxPlayer(3, cache=cache)
+    hare.initialize('A')
+    other = MinimaxPlayer(3, cache=cache, weights={'O': (0, 0, 0, 0, 1)})
+    other.initialize('O')
+    state = hounds.rules.start()
+    hounds.engine.search(state, 3)
+    assert hare.engine.search(state, 3)[0] != hounds.engine.search(state, 3)[0]
+    other.engine.search(state, 3)
+    assert other.engine.nodes > 0
+    prefixes = {hounds.engine.prefix(), hare.engine.prefix(),
+                other.engine.prefix()}
+    assert len(prefixes) == 3
+
+
+def test_endgame_solver_scores_small_positions_exactly():
+    import random
+    from endgame import EndgameSolver
+    from search import WIN, KonaneRules, SearchEngine
+    rng = random.Random(4)
+    rules = KonaneRules(6, endgame=12)
+    solver = EndgameSolver(6)
+    state = rules.start()
+    while solver.pieceCount(state[0]) > 12:
+        state = rules.play(state, rng.choice(rules.moves(state)))
+    value, move = SearchEngine(rules).search(state, 2)
+    if solver.solve(state[0], state[1]):
+        assert value >= WIN - 2
+    else:
+        assert value <= 2 - WIN
+
+
+def test_hare_canonical_keeps_stall_values():
+    import random
+    from search import HareRules, SearchEngine
+    from symmetry import HareSymmetry
+    rng = random.Random(1)
+    rules = HareRules()
+    symmetry = HareSymmetry()
+    for game in range(20):
+        state = rules.start()
+        while rules.result(state) is None and rules.moves(state):
+            state = (state[0], state[1], 9)
+            key, t = symmetry.canonical(*state)
+            assert SearchEngine(rules).search(state, 3)[0] == \
+                SearchEngine(rules).search(key, 3)[0]
+            state = rules.play(state, rng.choice(rules.moves(state)))
+
+
+def test_cache_stores_root_results_only(tmp_path):
+    from poscache import PositionCache
+    from search import CachedSearch, KonaneRules, SearchEngine
+    rules = KonaneRules(6)
+    state = rules.start()
+    for move in ([0, 0, 0, 0], [0, 1, 0, 1]):
+        state = rules.play(state, move)
+    search = CachedSearch(SearchEngine(rules),
+                          PositionCache(str(tmp_path / 'cache.db')))
+    result = search.search(state, 3)
+    assert len(search.cache) == 1
+    assert search.search(state, 3) == result
+    assert search.nodes == 0
+
+
+@pytest.mark.parametrize('depth', [1, 2, 3, 4])
+@pytest.mark.parametrize('game', ['konane', 'hare'])
+def test_search_modes_agree(game, depth):
+    import random
+    from search import MODES, HareRules, KonaneRules, SearchEngine
+    rng = random.Random(depth)
+    rules = KonaneRules(6) if game == 'konane' else HareRules()
+    for trial in range(5):
+        state = rules.start()
+        for ply in range(rng.randrange(2, 10)):
+            moves = rules.moves(state)
+            if rules.result(state) is not None or not moves:
+                break
+            state = rules.play(state, rng.choice(moves))
+        if rules.result(state) is not None or not rules.moves(state):
+            continue
+        values = set()
+        for mode in MODES:
+            value, move = SearchEngine(rules, mode=mode).search(state, depth)
+            values.add(value)
+            assert move in rules.moves(state)
+        assert len(values) == 1
@@ -0,0 +1,181 @@
+### File: tuner.py
+### Classes defined: SPSATuner
+###
+### Fits the weights of MinimaxPlayer.eval by self-play.  The tuned
+### vector is the hare's five weights followed by the hounds' five, in
+### the order of minimax.FEATURES.  Each SPSA iteration perturbs every
+### weight up or down at random, plays the two perturbed vectors against
+### each other (alternating sides) in a process pool, and moves the
+### weights towards whichever side scored better.
+
+import json
+import math
+import multiprocessing
+import os
+import random
+
+from minimax import DEFAULT_WEIGHTS, MinimaxPlayer
+from search import HareRules
+
+
+def splitWeights(theta):
+    """
+    Returns the MinimaxPlayer weights dict for a tuned vector.
+    """
+    return {'A': tuple(theta[:5]), 'O': tuple(theta[5:])}
+
+
+def playGame(spec):
+    """
+    Plays one game and returns 1 if the plus vector won, -1 if the minus
+    vector won and 0 if the game reached maxPlies.  The first randomPlies
+    moves are random so that games with the same weights differ.
+    """
+    plus, minus, plusSide, seed, depth, randomPlies, maxPlies = spec
+    rng = random.Random(seed)
+    rules = HareRules()
+    players = {}
+    for side in ('O', 'A'):
+        player = MinimaxPlayer(depth, weights=splitWeights(
+            plus if side == plusSide else minus))
+        player.initialize(side)
+        players[side] = player
+    state = rules.start()
+    winner = None
+    for ply in range(maxPlies):
+        winner = rules.result(state)
+        if winner is not None:
+            break
+        moves = rules.moves(state)
+        side = rules.toMove(state)
+        if not moves:
+            winner = rules.game.opponent(side)
+            break
+        if ply < randomPlies:
+            move = rng.choice(moves)
+        else:
+            move = players[side].getMove(list(state[0]))
+        state = rules.play(state, move)
+    if winner is None:
+        return 0
+    return 1 if winner == plusSide else -1
+
+
+class SPSATuner:
+    """
+    Simultaneous perturbation stochastic approximation over the eval
+    weights.
+
+    The step sizes follow the usual schedule a / (k + 1 + A)^0.602 and
+    c / (k + 1)^0.101, scaled per weight by the size of its starting
+    value.  State is written to checkpoint after every iteration and
+    picked up again by tune() if the file exists.  Tuning stops early,
+    after minIterations, once the last window iterations show no
+    significant difference between the perturbed vectors: their squared
+    match scores are compared with a chi-square distribution.
+    """
+    def __init__(self, theta=None, games=16, depth=4, workers=None,
+                 a=0.5, c=0.2, A=10, randomPlies=4, maxPlies=200,
+                 checkpoint=None, window=10, minIterations=20, zStop=0.0,
+                 seed=0):
+        if theta is None:
+            theta = list(DEFAULT_WEIGHTS['A']) + list(DEFAULT_WEIGHTS['O'])
+        self.theta = [float(w) for w in theta]
+        self.scales = [max(1.0, abs(w)) for w in self.theta]
+        self.games = games
+        self.depth = depth
+        self.workers = workers or multiprocessing.cpu_count()
+        self.a = a
+        self.c = c
+        self.A = A
+        self.randomPlies = randomPlies
+        self.maxPlies = maxPlies
+        self.checkpoint = checkpoint
+        self.window = window
+        self.minIterations = minIterations
+        self.zStop = zStop
+        self.seed = seed
+        self.iteration = 0
+        self.history = []
+
+    def save(self):
+        if self.checkpoint is None:
+            return
+        data = {'theta': self.theta, 'scales': self.scales,
+                'iteration': self.iteration, 'history': self.history}
+        temp = self.checkpoint + '.tmp'
+        with open(temp, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp, self.checkpoint)
+
+    def load(self):
+        if self.checkpoint is None or not os.path.exists(self.checkpoint):
+            return False
+        with open(self.checkpoint) as f:
+            data = json.load(f)
+        self.theta = data['theta']
+        self.scales = data['scales']
+        self.iteration = data['iteration']
+        self.history = data['history']
+        return True
+
+    def specs(self, plus, minus):
+        base = self.seed * 1000003 + self.iteration * self.games
+        return [(plus, minus, 'O' if i % 2 == 0 else 'A', base + i,
+                 self.depth, self.randomPlies, self.maxPlies)
+                for i in range(self.games)]
+
+    def step(self, pool):
+        """
+        Runs one iteration and returns the plus vector's mean score.
+        """
+        k = self.iteration
+        ak = self.a / (k + 1 + self.A) ** 0.602
+        ck = self.c / (k + 1) ** 0.101
+        rng = random.Random(self.seed * 7919 + k)
+        delta = [rng.choice((-1, 1)) for w in self.theta]
+        plus = [w + ck * s * d for w, s, d in zip(self.theta, self.scales, delta)]
+        minus = [w - ck * s * d for w, s, d in zip(self.theta, self.scales, delta)]
+        score = sum(pool.map(playGame, self.specs(plus, minus))) / self.games
+        self.theta = [w + ak * s * score / (2 * ck * d)
+                      for w, s, d in zip(self.theta, self.scales, delta)]
+        self.iteration += 1
+        self.history.append(score)
+        return score
+
+    def converged(self):
+        """
+        Returns true when the recent scores are consistent with the two
+        perturbed vectors being equally strong.
+        """
+        if self.iteration < self.minIterations or \
+           len(self.history) < self.window:
+            return False
+        k = self.window
+        statistic = sum(self.games * s * s for s in self.history[-k:])
+        # Wilson-Hilferty approximation to the chi-square distribution.
+        z = ((statistic / k) ** (1.0 / 3) - (1 - 2.0 / (9 * k))) / \
+            math.sqrt(2.0 / (9 * k))
+        return z < self.zStop
+
+    def tune(self, iterations, show=False):
+        """
+        Runs up to iterations SPSA iterations, resuming from the
+        checkpoint if there is one.  Returns the tuned weights dict.
+        """
+        self.load()
+        with multiprocessing.Pool(self.workers) as pool:
+            while self.iteration < iterations:
+                score = self.step(pool)
+                self.save()
+                if show:
+                    print ("Iteration", self.iteration, "score", score,
+                           [round(w, 2) for w in self.theta])
+                if self.converged():
+                    break
+        return splitWeights(self.theta)
+
+
+if __name__ == "__main__":
+    tuner = SPSATuner(checkpoint="weights.json")
+    print (tuner.tune(200, show=True))
@@ -0,0 +1,251 @@
+### File: variants.py
+### Classes defined: BoardVariant, VariantHoundsAndHare, VariantRules,
+### VariantSearchPlayer, VariantRandomPlayer
+###
+### Hounds and Hare on longer boards and with more hounds.  The standard
+### board is three rows by five columns with the two corners at each end
+### cut off, squares numbered column by column from the left tip:
+###
+###     X 1 4 7 X
+###     0 2 5 8 10
+###     X 3 6 9 X
+###
+### A variant keeps that shape with any odd number of inner columns.
+### Every point is joined to its orthogonal neighbours, and the middle-row
+### points in even columns (0, 5 and 10 on the standard board) are also
+### joined diagonally; with an odd number of inner columns both tips are
+### in even columns and keep their diagonals.  All the geometry of a
+### variant is worked out once and shared through variant().
+###
+### Stalls are counted as HoundsAndHare.makeMove counts them: a hound
+### move between consecutive squares, which is a vertical move within a
+### column, or a move between a tip and its neighbour numbered next to
+### it (0 and 1, and 9 and 10 on the standard board).
+
+import functools
+import random
+
+import harev2
+from search import HareRules, SearchPlayer, makeEngine
+
+
+class BoardVariant:
+    """
+    The geometry of a board with the given number of inner columns and
+    hounds.  coordinates[s] is the (row, column) of square s, edges[s]
+    its neighbours, and houndTargets[s] / hareTargets[s] the squares a
+    hound / the hare could move to from s on an empty board.
+    """
+    def __init__(self, columns=3, hounds=3):
+        if columns < 1 or columns % 2 == 0:
+            raise harev2.HoundsAndHareError(
+                "the number of inner columns must be odd")
+        self.columns = columns
+        self.width = columns + 2
+        coordinates = [(1, 0)]
+        for c in range(1, columns + 1):
+            coordinates += [(0, c), (1, c), (2, c)]
+        coordinates.append((1, self.width - 1))
+        self.coordinates = tuple(coordinates)
+        self.size = len(coordinates)
+        if hounds >= self.size:
+            raise harev2.HoundsAndHareError("too many hounds for the board")
+        index = {point: s for s, point in enumerate(coordinates)}
+        self.index = index
+        edges = {s: set() for s in range(self.size)}
+        for s, (r, c) in enumerate(coordinates):
+            steps = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+            if r == 1 and c % 2 == 0:
+                steps += [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+            for dr, dc in steps:
+                other = index.get((r + dr, c + dc))
+                if other is not None:
+                    edges[s].add(other)
+                    edges[other].add(s)
+        self.edges = {s: frozenset(edges[s]) for s in edges}
+        self.column = tuple(c for r, c in coordinates)
+        self.row = tuple(r for r, c in coordinates)
+        self.hareTargets = tuple(tuple(sorted(self.edges[s]))
+                                 for s in range(self.size))
+        self.houndTargets = tuple(
+            tuple(t for t in sorted(self.edges[s])
+                  if self.column[t] >= self.column[s])
+            for s in range(self.size))
+        self.houndNames = tuple('h' + str(i + 1) for i in range(hounds))
+        start = ['_'] * self.size
+        order = sorted(range(self.size - 1),
+                       key=lambda s: (self.column[s], s != 1 and s != 3,
+                                      s))
+        for name, s in zip(self.houndNames, order):
+            start[s] = name
+        start[self.size - 1] = 'A'
+        self.start = tuple(start)
+
+    def boardToStr(self, board):
+        """
+        Returns the board laid out in its three rows.
+        """
+        rows = [['X'] * self.width for r in range(3)]
+        for s, (r, c) in enumerate(self.coordinates):
+            rows[r][c] = str(board[s])
+        return '\n'.join(' '.join(row) for row in rows)
+
+
+@functools.lru_cache(maxsize=None)
+def variant(columns=3, hounds=3):
+    """
+    Returns the shared BoardVariant for a board size.
+    """
+    return BoardVariant(columns, hounds)
+
+
+class VariantHoundsAndHare(harev2.HoundsAndHare):
+    """
+    HoundsAndHare on a generated board.  With the default arguments it
+    plays exactly the standard game.
+    """
+    def __init__(self, columns=3, hounds=3):
+        self.variant = variant(columns, hounds)
+        harev2.HoundsAndHare.__init__(self)
+
+    def reset(self):
+        self.stall = 0
+        self.board = list(self.variant.start)
+
+    def boardToStr(self, board):
+        return self.variant.boardToStr(board)
+
+    def valid(self, row):
+        return 0 <= row < self.variant.size
+
+    def can_move(self, board, player, current_pos, new_pos):
+        if not self.valid(new_pos) or board[new_pos] != '_':
+            return False
+        if player == 'O':
+            return new_pos in self.variant.houndTargets[current_pos]
+        return new_pos in self.variant.edges[current_pos]
+
+    def get_hounds_position(self, board):
+        return tuple(board.index(h) for h in self.variant.houndNames)
+
+    def getColumn(self, board, piece):
+        return self.variant.column[board.index(piece)]
+
+    def getRow(self, board, piece):
+        return self.variant.row[board.index(piece)]
+
+    def generateHoundMoves(self, board):
+        moves = []
+        for pos in self.get_hounds_position(board):
+            for target in self.variant.houndTargets[pos]:
+                if board[target] == '_':
+                    moves.append([pos, target])
+        return moves
+
+    def generateHareMoves(self, board):
+        pos = board.index('A')
+        return [[pos, target] for target in self.variant.hareTargets[pos]
+                if board[target] == '_']
+
+    def makeMove(self, player, move):
+        self.board = self.nextBoard(self.board, player, move)
+        if player == 'O':
+            if abs(move[0] - move[1]) == 1:
+                self.stall += 1
+            else:
+                self.stall = 0
+
+    def numHoundsPassed(self, board):
+        hare = self.getColumn(board, 'A')
+        return sum(1 for h in self.variant.houndNames
+                   if self.getColumn(board, h) >= hare)
+
+
+class VariantRules(HareRules):
+    """
+    HareRules for a generated board.  Moves pack into 16 bits, so boards
+    of up to 255 squares are supported.
+    """
+    def __init__(self, columns=3, hounds=3):
+        self.game = VariantHoundsAndHare(columns, hounds)
+        self.variant = self.game.variant
+
+    def name(self):
+        return 'hare%dx%d' % (self.variant.columns,
+                              len(self.variant.houndNames))
+
+    def start(self):
+        return (self.variant.start, 'O', 0)
+
+    def moves(self, state):
+        board = state[0]
+        if state[1] == 'A':
+            return self.game.generateHareMoves(board)
+        return self.game.generateHoundMoves(board)
+
+    def play(self, state, move):
+        board, player, stall = state
+        cells = list(board)
+        cells[move[1]] = cells[move[0]]
+        cells[move[0]] = '_'
+        if player == 'O':
+            stall = stall + 1 if abs(move[0] - move[1]) == 1 else 0
+        return (tuple(cells), self.game.opponent(player), stall)
+
+    def result(self, state):
+        board, player, stall = state
+        if board[0] == 'A' or stall >= 10:
+            return 'A'
+        column = self.variant.column
+        hare = column[board.index('A')]
+        if all(column[board.index(h)] > hare
+               for h in self.variant.houndNames):
+            return 'A'
+        return None
+
+    def evaluate(self, state):
+        board = state[0]
+        column = self.variant.column
+        hare = column[board.index('A')]
+        passed = sum(1 for h in self.variant.houndNames
+                     if column[board.index(h)] >= hare)
+        score = passed - hare
+        return score if state[1] == 'A' else -score
+
+    def packMove(self, move):
+        return (move[0] << 8) | move[1]
+
+    def unpackMove(self, code):
+        return [code >> 8, code & 0xFF]
+
+
+class VariantSearchPlayer(SearchPlayer, harev2.Player):
+    """
+    Alpha-beta search on a generated board.
+    """
+    def __init__(self, depthLimit, columns=3, hounds=3, workers=1,
+                 cache=None, ponder=False):
+        self.rules = VariantRules(columns, hounds)
+        self.engine = makeEngine(self.rules, workers=workers, cache=cache)
+        self.limit = depthLimit
+        self.ponder = ponder
+
+    def initialize(self, side):
+        self.stopPondering()
+        self.side = side
+        self.name = "VariantSearchPlayer"
+
+
+class VariantRandomPlayer(VariantHoundsAndHare, harev2.Player):
+    """
+    Chooses a random move from the set of possible moves.
+    """
+    def initialize(self, side):
+        self.side = side
+        self.name = "VariantRandomPlayer"
+
+    def getMove(self, board):
+        moves = self.generateMoves(board, self.side)
+        if not moves:
+            return []
+        return moves[random.randrange(0, len(moves))]